@@ -0,0 +1,61 @@
+# Dépendances d'authentification des routes async (app/api/async_routes.py) :
+# mêmes règles que app/api/dependencies.py, lectures via get_async_db.
+# Module séparé : la pile async n'est importée que si DB_ASYNC=True.
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import (
+    _check_role,
+    _check_token_version,
+    _credentials_exception,
+    _decode_or_401,
+    _principal_from_claims,
+    _principal_from_user,
+    oauth2_scheme,
+)
+from app.core.config import settings
+from app.crud import async_crud
+from app.db.async_session import get_async_db
+from app.models.user import User
+from app.schemas.user import Principal
+from app.services.principal_cache import principal_cache
+from app.services.token_versions import token_versions
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme),
+                                 db: AsyncSession = Depends(get_async_db)) -> User:
+    # Chemin chaud : token déjà vérifié, aucune requête DB
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached[1]
+
+    payload = _decode_or_401(token)
+    user_id = int(payload["sub"])
+
+    generation = principal_cache.generation(user_id)
+    user = await async_crud.get_user_by_id(db, user_id)
+    if user is None:
+        raise _credentials_exception()
+    _check_token_version(payload, user)
+    principal_cache.set(token, payload, user, generation)
+    return user
+
+
+async def get_current_principal_async(token: str = Depends(oauth2_scheme),
+                                      db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """Identité construite à partir des claims signés du JWT, comme get_current_principal."""
+    payload = _decode_or_401(token)
+    user_id = int(payload["sub"])
+
+    if "ver" not in payload:
+        return _principal_from_user(await get_current_user_async(token, db))
+
+    return _principal_from_claims(payload, await token_versions.get_async(db, user_id))
+
+
+def require_role_async(required_roles: list):
+    auth_dependency = get_current_principal_async if settings.AUTH_TRUST_TOKEN_CLAIMS else get_current_user_async
+
+    async def role_checker(user=Depends(auth_dependency)):
+        return _check_role(user, required_roles)
+    return role_checker
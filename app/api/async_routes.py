@@ -0,0 +1,106 @@
+
+# Variantes async (AsyncSession) des routes les plus sollicitées : polling
+# (/departments, /documents, /checklists/me) et complétion d'un item.
+# Montées avant les routers sync quand DB_ASYNC=True (voir app/main.py),
+# elles prennent alors la place des routes sync de même chemin.
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.core.config import settings
+from app.db.async_session import get_async_db
+from app.services.onboarding_plans import plan_rows_to_items
+from app.crud import async_crud
+from app.schemas.checklist import ChecklistOut
+from app.schemas.department import DepartmentOut
+from app.schemas.document import DocumentOut
+from app.api.async_dependencies import get_current_user_async, require_role_async
+from app.api.etags import my_checklist_version, not_modified, visibility_scope
+from app.api.pagination import PageParams, set_page_headers
+from app.api.fieldsets import sparse_fields
+from app.api.responses import fast_columns, list_response
+from app.services.read_cache import DEPARTMENTS, DOCUMENTS, read_cache
+from app.crud.department_crud import DEPARTMENT_PAGE_KEYS
+from app.crud.checklist_crud import CHECKLIST_OUT_COLUMNS
+from app.crud.document_crud import DOCUMENT_OUT_COLUMNS, DOCUMENT_PAGE_KEYS
+
+router = APIRouter()
+
+
+@router.get("/departments/", response_model=List[DepartmentOut], tags=["departments"])
+async def get_departments(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    auth_user=Depends(require_role_async(["SUPERADMIN", "RH", "DEPT", "MANAGER"])),
+):
+    unchanged = not_modified(request, response, "departments", read_cache.version(DEPARTMENTS),
+                             skip, limit, page.cursor, page.with_total)
+    if unchanged:
+        return unchanged
+    depts = await async_crud.list_departments(db, skip=skip, limit=limit, cursor=page.cursor)
+    total = await async_crud.count_departments(db) if page.with_total else None
+    set_page_headers(response, depts, DEPARTMENT_PAGE_KEYS, limit, total)
+    return depts
+
+
+@router.get("/documents/", response_model=List[DocumentOut], tags=["documents"])
+async def get_docs(
+    request: Request,
+    response: Response,
+    department_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(DocumentOut)),
+    db: AsyncSession = Depends(get_async_db),
+    auth_user = Depends(get_current_user_async),
+):
+    user_role = getattr(auth_user, "role", None)
+    user_dept = getattr(auth_user, "department_id", None)
+
+    if user_role not in ("SUPERADMIN", "RH") and department_id is not None and department_id != user_dept:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Cannot access documents of other department")
+
+    unchanged = not_modified(request, response, "documents", read_cache.version(DOCUMENTS), visibility_scope(auth_user),
+                             department_id, skip, limit, page.cursor, page.with_total, fields)
+    if unchanged:
+        return unchanged
+
+    columns = fast_columns(DOCUMENT_OUT_COLUMNS, fields)
+    docs = await async_crud.list_documents(db, department_id=department_id, skip=skip, limit=limit,
+                                           cursor=page.cursor, principal=auth_user, columns=columns)
+    total = await async_crud.count_documents(db, department_id, principal=auth_user) if page.with_total else None
+    set_page_headers(response, docs, DOCUMENT_PAGE_KEYS, limit, total)
+    return list_response(docs, columns, response)
+
+
+@router.get("/checklists/me", response_model=List[ChecklistOut], tags=["checklists"])
+async def my_checklist(request: Request, response: Response,
+                       fields: Optional[List[str]] = Depends(sparse_fields(ChecklistOut)),
+                       db: AsyncSession = Depends(get_async_db), auth_user=Depends(get_current_user_async)):
+    unchanged = not_modified(request, response, *my_checklist_version(auth_user.id), fields)
+    if unchanged:
+        return unchanged
+    columns = fast_columns(CHECKLIST_OUT_COLUMNS, fields)
+    items = await async_crud.list_checklist_items_for_user(db, auth_user.id, columns=columns)
+    plan_items = []
+    if settings.ONBOARDING_MODE == "plan":
+        rows = await async_crud.list_plan_view(db, auth_user.id)
+        plan_items = plan_rows_to_items(rows, auth_user.id)
+    return list_response(items, columns, response, head=plan_items)
+
+
+@router.post("/checklists/{item_id}/complete", response_model=ChecklistOut, tags=["checklists"])
+async def complete_item(item_id: int, db: AsyncSession = Depends(get_async_db), auth_user=Depends(get_current_user_async)):
+    # UPDATE conditionnel ... RETURNING, comme la route sync
+    item = await async_crud.complete_checklist_item_if_allowed(db, item_id, auth_user)
+    if item:
+        return item
+    if not await async_crud.checklist_item_exists(db, item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
+    raise HTTPException(status_code=403, detail="Not allowed to complete this item")
@@ -1,23 +1,31 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, status
+import math
+
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.models.user import User
-from app.crud.user_crud import get_user_by_email
+from app.crud.user_crud import get_user_by_email, get_user_by_id, get_user_by_login, revoke_user_tokens, user_tokens_revoked
 from app.api.dependencies import get_current_user
 from app.services.email_service import send_reset_password_email
+from app.services.rate_limiter import login_limiter
+from app.services.token_revocation import revoked_tokens
+from app.services.token_versions import token_versions
 from app.core.security import (
     create_reset_token,
     decode_reset_token,
-    hash_password,
+    hash_password_async,
     verify_password,
-    create_access_token
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
 )
 from app.schemas.user import (
     Token,
+    RefreshRequest,
     UserOut,
     ForgotPasswordRequest,
     ResetPasswordRequest
@@ -25,23 +33,49 @@ from app.schemas.user import (
 
 from app.core.config import settings
 
-ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES or 1440
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES or 15
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+
+def issue_tokens(user: User) -> dict:
+    """Access token court + refresh token à usage unique."""
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    token = create_access_token(
+        user_id=user.id,  # passer l'ID de l'utilisateur
+        role=user.role,  # passer le rôle
+        expires_delta=access_token_expires,
+        department_id=user.department_id,
+        token_version=user.token_version or 0,
+    )
+    refresh_token, _, _ = create_refresh_token(user.id, token_version=user.token_version or 0)
+    return {"access_token": token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+def enforce_login_rate_limit(scope: str, request: Request, identifier: str) -> None:
+    """429 avant tout hash si l'IP ou l'identifiant a épuisé son budget."""
+    ip = request.client.host if request.client else "unknown"
+    retry_after = login_limiter.check(scope, ip, identifier)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
 # LOGIN / GET TOKEN
 @router.post("/token", response_model=Token)
 def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    # d'abord essayer avec email
-    user = get_user_by_email(db, form_data.username)
+    enforce_login_rate_limit("token", request, form_data.username)
 
-    # sinon essayer avec username
-    if not user:
-        user = db.query(User).filter(User.username == form_data.username).first()
+    # email ou username, en une seule requête
+    user = get_user_by_login(db, form_data.username)
 
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -49,13 +83,43 @@ def login_for_access_token(
             detail="Incorrect username or password"
         )
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    token = create_access_token(
-        user_id=user.id,  # passer l'ID de l'utilisateur
-        role=user.role,  # passer le rôle
-        expires_delta=access_token_expires
+    return issue_tokens(user)
+
+
+# REFRESH (rotation : l'ancien refresh token est révoqué)
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(rr: RefreshRequest, db: Session = Depends(get_db)):
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": token, "token_type": "bearer"}
+    payload = decode_refresh_token(rr.refresh_token)
+    if not payload:
+        raise invalid_token
+
+    user_id = int(payload["sub"])
+    current_version = token_versions.get(db, user_id)
+    if current_version is None or current_version != payload.get("ver"):
+        raise invalid_token
+
+    jti = payload["jti"]
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    if not revoked_tokens.revoke(db, jti, expires_at):
+        # Réutilisation d'un refresh token déjà tourné : probable vol,
+        # on révoque toute la session de l'utilisateur.
+        user = get_user_by_id(db, user_id)
+        if user:
+            revoke_user_tokens(user)
+            user_tokens_revoked(db, user)
+            # commit explicite : la révocation doit survivre au 401 (qui annule la requête)
+            db.commit()
+        raise invalid_token
+
+    user = get_user_by_id(db, user_id)
+    if not user:
+        raise invalid_token
+    return issue_tokens(user)
 
 
 
@@ -68,7 +132,13 @@ def read_me(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/forgot-password")
-async def forgot_password(fpr: ForgotPasswordRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def forgot_password(
+    fpr: ForgotPasswordRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    enforce_login_rate_limit("forgot-password", request, fpr.email)
     user = get_user_by_email(db, fpr.email)
     if not user:
         # Pas d'information sur l'existence du user pour sécurité
@@ -92,8 +162,8 @@ async def reset_password(rpr: ResetPasswordRequest, db: Session = Depends(get_db
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    user.hashed_password = hash_password(rpr.new_password)
-    db.add(user)
-    db.commit()
+    user.hashed_password = await hash_password_async(rpr.new_password)
+    revoke_user_tokens(user)
+    user_tokens_revoked(db, user)
     return {"msg": "Password reset successfully."}
 
@@ -1,26 +1,178 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.db.session import get_db
-from app.schemas.checklist import ChecklistCreate, ChecklistOut, ChecklistUpdate
+from app.schemas.checklist import (
+    ChecklistBatchIds,
+    ChecklistBatchReport,
+    ChecklistBatchUpdate,
+    ChecklistCreate,
+    ChecklistOut,
+    ChecklistUpdate,
+    PropagationJobOut,
+)
 from app.crud.checklist_crud import (
     create_checklist_item,
     list_checklist_items_for_user,
     list_department_template,
-    mark_item_completed,
     get_checklist_item,
     list_all_checklist_items,
-    update_checklist_item,
-    delete_checklist_item,
+    count_checklist_items,
+    CHECKLIST_PAGE_KEYS,
+    CHECKLIST_OUT_COLUMNS,
+    list_items_with_permission,
+    apply_checklist_item_changes,
+    get_checklist_item_with_permission,
+    checklist_item_exists,
+    complete_checklist_item_if_allowed,
+    delete_checklist_item_if_allowed,
+    bulk_update_checklist_items,
+    bulk_delete_checklist_items,
 )
 from app.api.dependencies import get_current_user, require_role
+from app.api.etags import my_checklist_version, not_modified
+from app.api.pagination import PageParams, set_page_headers
+from app.api.fieldsets import sparse_fields
+from app.api.responses import export_response, fast_columns, list_response, partial_response
+from app.crud.department_crud import get_department
 from app.crud.user_crud import get_user_by_id
+from app.core.config import settings
+from app.crud.onboarding_plan_crud import complete_plan_step, is_step_in_current_plan
 from app.services.onboarding import assign_onboarding_for_user
+from app.services.exports import checklist_items_export, stream_export
+from app.services.onboarding_plans import plan_items_for_user
+from app.services.read_cache import invalidate_user_checklists
+from app.services.template_propagation import create_job, get_job, run_propagation
 
 router = APIRouter(prefix="/checklists", tags=["checklists"])
 
+
+def schedule_propagation(db: Session, background_tasks: BackgroundTasks, response: Response, action: str,
+                         title: str, department_id: Optional[int], old_title: Optional[str] = None,
+                         old_department_id: Optional[int] = None):
+    """Lance la propagation d'un template après la réponse ; l'id du job est renvoyé en en-tête."""
+    job = create_job(db, action, title, department_id, old_title, old_department_id)
+    background_tasks.add_task(run_propagation, job.id)
+    response.headers["X-Propagation-Job"] = job.id
+    return job
+
+
+def check_reassignment(db: Session, auth_user, changes: dict) -> None:
+    """
+    Nouveau propriétaire / département demandés par une modification (unitaire ou par lot) :
+    ils doivent exister, et DEPT/MANAGER ne réattribuent qu'à un user de leur département.
+    Lus par les loaders de la requête : déjà chargés (ex. le principal), ils ne coûtent rien.
+    """
+    user_id, department_id = changes.get("user_id"), changes.get("department_id")
+    if user_id is not None:
+        target_user = get_user_by_id(db, user_id)
+        if not target_user:
+            raise HTTPException(status_code=404, detail="Target user not found")
+        if auth_user.role in ("DEPT", "MANAGER") and target_user.department_id != auth_user.department_id:
+            raise HTTPException(status_code=403, detail="Cannot assign checklist to a user from another department")
+    if department_id is not None and not get_department(db, department_id):
+        raise HTTPException(status_code=404, detail="Department not found")
+
+
+def _run_batch(db: Session, auth_user, action: str, done_status: str, ids: List[int], apply,
+               new_owner: Optional[int] = None):
+    """
+    Vérifie les droits de tous les ids en une requête (prédicat SQL) et applique `apply(ids, templates)`
+    dans la transaction de la requête. Retourne (rapport par id, lignes autorisées lues avant modification).
+    `new_owner` : user à qui les items sont réattribués (sa checklist change aussi).
+    """
+    ids = list(dict.fromkeys(ids))
+    rows = list_items_with_permission(db, ids, auth_user, action)
+    results, allowed = [], []
+    for item_id in ids:
+        row = rows.get(item_id)
+        if row is None:
+            results.append({"id": item_id, "status": "not_found"})
+        elif not row[4]:
+            results.append({"id": item_id, "status": "forbidden"})
+        else:
+            allowed.append(row)
+            results.append({"id": item_id, "status": done_status})
+
+    if allowed:
+        # 2e argument : le lot contient-il des templates (invalidation du cache de lecture)
+        apply([row[0] for row in allowed], any(row[1] is None for row in allowed))
+        invalidate_user_checklists(db, [row[1] for row in allowed] + [new_owner])
+
+    report = {"succeeded": len(allowed), "failed": len(ids) - len(allowed), "results": results}
+    return report, allowed
+
+
+# Compléter plusieurs items (ex. « tout marquer comme fait » d'un manager)
+@router.post("/batch/complete", response_model=ChecklistBatchReport)
+def complete_items_batch(
+    payload: ChecklistBatchIds,
+    db: Session = Depends(get_db),
+    auth_user=Depends(get_current_user),
+):
+    report, _ = _run_batch(
+        db, auth_user, "complete", "completed", payload.ids,
+        lambda ids, templates: bulk_update_checklist_items(db, ids, {"completed": True}, templates=templates),
+    )
+    return report
+
+
+# Modifier plusieurs items avec les mêmes changements
+@router.post("/batch/update", response_model=ChecklistBatchReport)
+def update_items_batch(
+    payload: ChecklistBatchUpdate,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db),
+    auth_user=Depends(get_current_user),
+):
+    # même sémantique que PUT /{id} : seules les valeurs non nulles sont appliquées
+    changes = {k: v for k, v in payload.changes.dict(exclude_unset=True).items() if v is not None}
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    check_reassignment(db, auth_user, changes)
+
+    report, updated = _run_batch(
+        db, auth_user, "update", "updated", payload.ids,
+        lambda ids, templates: bulk_update_checklist_items(db, ids, changes, templates=templates),
+        new_owner=changes.get("user_id"),
+    )
+
+    # templates modifiés : propagation aux copies, comme pour la route unitaire
+    for _, user_id, old_title, old_department_id, _ in updated:
+        if user_id is not None:
+            continue
+        if "user_id" in changes:
+            schedule_propagation(db, background_tasks, response, "delete", old_title, old_department_id)
+        elif ("title" in changes and changes["title"] != old_title) or (
+            "department_id" in changes and changes["department_id"] != old_department_id
+        ):
+            schedule_propagation(db, background_tasks, response, "update", changes.get("title", old_title),
+                                 changes.get("department_id", old_department_id), old_title, old_department_id)
+    return report
+
+
+# Supprimer plusieurs items
+@router.post("/batch/delete", response_model=ChecklistBatchReport)
+def delete_items_batch(
+    payload: ChecklistBatchIds,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db),
+    auth_user=Depends(get_current_user),
+):
+    report, deleted = _run_batch(
+        db, auth_user, "delete", "deleted", payload.ids,
+        lambda ids, templates: bulk_delete_checklist_items(db, ids, templates=templates),
+    )
+    for _, user_id, title, department_id, _ in deleted:
+        if user_id is None:
+            schedule_propagation(db, background_tasks, response, "delete", title, department_id)
+    return report
+
+
 # Créer un item pour un utilisateur
 @router.post("/", response_model=ChecklistOut, status_code=status.HTTP_201_CREATED)
 def create_item(
@@ -53,6 +205,8 @@ def create_item(
 @router.post("/template", response_model=ChecklistOut, status_code=status.HTTP_201_CREATED)
 def create_template(
     item_in: ChecklistCreate,
+    background_tasks: BackgroundTasks,
+    response: Response,
     db: Session = Depends(get_db),
     auth_user=Depends(require_role(["SUPERADMIN", "RH", "DEPT"])),  # MANAGER exclu
 ):
@@ -65,7 +219,46 @@ def create_template(
         # Forcer department_id = celui du DEPT
         item_in.department_id = auth_user.department_id
 
-    return create_checklist_item(db, item_in)
+    template = create_checklist_item(db, item_in)
+    # les employés déjà en poste reçoivent le nouveau template
+    schedule_propagation(db, background_tasks, response, "create", template.title, template.department_id)
+    return template
+
+
+# Relancer la propagation d'un template (idempotent)
+@router.post("/template/{template_id}/propagate", response_model=PropagationJobOut,
+             status_code=status.HTTP_202_ACCEPTED)
+def propagate_template(
+    template_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    db: Session = Depends(get_db),
+    auth_user=Depends(require_role(["SUPERADMIN", "RH", "DEPT"])),
+):
+    template = get_checklist_item(db, template_id)
+    if not template or template.user_id is not None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    if auth_user.role == "DEPT" and template.department_id != auth_user.department_id:
+        raise HTTPException(status_code=403, detail="Cannot propagate templates of another department")
+    return schedule_propagation(db, background_tasks, response, "create", template.title, template.department_id)
+
+
+# Progression d'une propagation
+@router.get("/propagation/{job_id}", response_model=PropagationJobOut)
+def get_propagation_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    auth_user=Depends(require_role(["SUPERADMIN", "RH", "DEPT"])),
+):
+    job = get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Propagation job not found")
+    # DEPT : seulement les jobs qui touchent son département
+    if auth_user.role not in ("SUPERADMIN", "RH") and auth_user.department_id not in (
+        job.department_id, job.old_department_id
+    ):
+        raise HTTPException(status_code=403, detail="Not allowed to view this propagation job")
+    return job
 
 
 
@@ -74,10 +267,13 @@ def create_template(
 # List items
 @router.get("/", response_model=List[ChecklistOut])
 def list_items(
+    response: Response,
     user_id: Optional[int] = None,
     department_id: Optional[int] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(ChecklistOut)),
     db: Session = Depends(get_db),
     auth_user=Depends(get_current_user),
 ):
@@ -91,14 +287,13 @@ def list_items(
             raise HTTPException(status_code=400, detail="User does not belong to given department")
 
         # droits : owner, SUPERADMIN, RH, DEPT(manager du même dept)
-        if auth_user.id == user_id:
-            return list_checklist_items_for_user(db, user_id)
-
-        if auth_user.role in ("SUPERADMIN", "RH"):
-            return list_checklist_items_for_user(db, user_id)
-
-        if auth_user.role in ("DEPT", "MANAGER") and auth_user.department_id == target_user.department_id:
-            return list_checklist_items_for_user(db, user_id)
+        if (
+            auth_user.id == user_id
+            or auth_user.role in ("SUPERADMIN", "RH")
+            or (auth_user.role in ("DEPT", "MANAGER") and auth_user.department_id == target_user.department_id)
+        ):
+            columns = fast_columns(CHECKLIST_OUT_COLUMNS, fields)
+            return list_response(list_checklist_items_for_user(db, user_id, columns=columns), columns, response)
 
         raise HTTPException(status_code=403, detail="Not allowed to view these items")
 
@@ -106,44 +301,72 @@ def list_items(
         # DEPT/MANAGER ne peuvent que leur propre département
         if auth_user.role in ("DEPT", "MANAGER") and auth_user.department_id != department_id:
             raise HTTPException(status_code=403, detail="Not allowed to view templates of another department")
-        return list_department_template(db, department_id)
+        # servis depuis le cache de lecture : seule la sortie est réduite
+        return partial_response(list_department_template(db, department_id), ChecklistOut, fields)
 
     # listing global
     if auth_user.role in ("SUPERADMIN", "RH"):
-        return list_all_checklist_items(db, skip=skip, limit=limit)
+        columns = fast_columns(CHECKLIST_OUT_COLUMNS, fields)
+        items = list_all_checklist_items(db, skip=skip, limit=limit, cursor=page.cursor, principal=auth_user,
+                                         columns=columns)
+        total = count_checklist_items(db, principal=auth_user) if page.with_total else None
+        set_page_headers(response, items, CHECKLIST_PAGE_KEYS, limit, total)
+        return list_response(items, columns, response)
 
     # sinon, si pas de dept fourni → checklist du propre département du manager
     if auth_user.role in ("DEPT", "MANAGER") and auth_user.department_id:
-        return list_department_template(db, auth_user.department_id)
+        return partial_response(list_department_template(db, auth_user.department_id), ChecklistOut, fields)
 
     raise HTTPException(status_code=403, detail="Not allowed to list all checklists")
 
 
+# Export (flux NDJSON / CSV) de la progression des checklists
+@router.get("/export")
+def export_items(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    auth_user=Depends(require_role(["SUPERADMIN", "RH", "MANAGER", "DEPT"])),
+):
+    return export_response(stream_export(checklist_items_export(auth_user), fmt), fmt, "checklists")
+
+
 # Get my checklist
 @router.get("/me", response_model=List[ChecklistOut])
-def my_checklist(db: Session = Depends(get_db), auth_user=Depends(get_current_user)):
-    return list_checklist_items_for_user(db, auth_user.id)
+def my_checklist(request: Request, response: Response,
+                 fields: Optional[List[str]] = Depends(sparse_fields(ChecklistOut)),
+                 db: Session = Depends(get_db), auth_user=Depends(get_current_user)):
+    unchanged = not_modified(request, response, *my_checklist_version(auth_user.id), fields)
+    if unchanged:
+        return unchanged
+    columns = fast_columns(CHECKLIST_OUT_COLUMNS, fields)
+    items = list_checklist_items_for_user(db, auth_user.id, columns=columns)
+    plan_items = []
+    if settings.ONBOARDING_MODE == "plan":
+        # étapes du plan + état creux du user, fusionnés en une requête
+        plan_items = plan_items_for_user(db, auth_user.id)
+    return list_response(items, columns, response, head=plan_items)
+
+
+# Mark a plan step complete (mode plan)
+@router.post("/plan-steps/{step_id}/complete", response_model=List[ChecklistOut])
+def complete_plan_step_route(step_id: int, db: Session = Depends(get_db), auth_user=Depends(get_current_user)):
+    if not is_step_in_current_plan(db, auth_user.id, step_id):
+        raise HTTPException(status_code=404, detail="Step not found in your onboarding plan")
+    complete_plan_step(db, auth_user.id, step_id)
+    return plan_items_for_user(db, auth_user.id)
 
 
 # Get single item
 @router.get("/{item_id}", response_model=ChecklistOut)
-def get_item(item_id: int, db: Session = Depends(get_db), auth_user=Depends(get_current_user)):
-    item = get_checklist_item(db, item_id)
-    if not item:
+def get_item(item_id: int, fields: Optional[List[str]] = Depends(sparse_fields(ChecklistOut)),
+             db: Session = Depends(get_db), auth_user=Depends(get_current_user)):
+    # item + droit évalué en SQL : une requête
+    found = get_checklist_item_with_permission(db, item_id, auth_user, "view")
+    if not found:
         raise HTTPException(status_code=404, detail="Item not found")
-
-    if item.user_id == auth_user.id:
-        return item
-
-    target_user = get_user_by_id(db, item.user_id) if item.user_id else None
-
-    if auth_user.role in ("SUPERADMIN", "RH"):
-        return item
-
-    if auth_user.role in ("DEPT", "MANAGER") and target_user and auth_user.department_id == target_user.department_id:
-        return item
-
-    raise HTTPException(status_code=403, detail="Not allowed")
+    item, allowed = found
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return partial_response(item, ChecklistOut, fields)
 
 
 # Update item
@@ -151,57 +374,47 @@ def get_item(item_id: int, db: Session = Depends(get_db), auth_user=Depends(get_
 def update_item(
     item_id: int,
     payload: ChecklistUpdate,
+    background_tasks: BackgroundTasks,
+    response: Response,
     db: Session = Depends(get_db),
     auth_user=Depends(get_current_user)
 ):
-    item = get_checklist_item(db, item_id)
-    if not item:
+    found = get_checklist_item_with_permission(db, item_id, auth_user, "update")
+    if not found:
         raise HTTPException(status_code=404, detail="Item not found")
-
-    target_user = get_user_by_id(db, item.user_id) if item.user_id else None
-
-    allowed = False
-
-    # Admin / RH : accès total
-    if auth_user.role in ("SUPERADMIN", "RH"):
-        allowed = True
-
-    # Manager / Dept : accès si même département
-    if auth_user.role in ("DEPT", "MANAGER"):
-        if target_user and auth_user.department_id == target_user.department_id:
-            allowed = True
-        elif item.department_id and auth_user.department_id == item.department_id:
-            allowed = True
-
+    item, allowed = found
     if not allowed:
         raise HTTPException(status_code=403, detail="Not allowed to update this item")
 
-    updated = update_checklist_item(db, item_id, payload.dict(exclude_unset=True))
-    if not updated:
-        raise HTTPException(status_code=500, detail="Unable to update item")
+    changes = payload.dict(exclude_unset=True)
+    check_reassignment(db, auth_user, changes)
+
+    is_template = item.user_id is None
+    old_title, old_department_id = item.title, item.department_id
 
-    return updated
+    # un seul UPDATE au flush, pas de relecture
+    apply_checklist_item_changes(db, item, changes)
 
+    if is_template:
+        if item.user_id is not None:
+            # le template est devenu un item personnel : retirer ses copies
+            schedule_propagation(db, background_tasks, response, "delete", old_title, old_department_id)
+        elif (item.title, item.department_id) != (old_title, old_department_id):
+            schedule_propagation(db, background_tasks, response, "update", item.title, item.department_id,
+                                 old_title, old_department_id)
+
+    return item
 
 
 # Mark complete
 @router.post("/{item_id}/complete", response_model=ChecklistOut)
 def complete_item(item_id: int, db: Session = Depends(get_db), auth_user=Depends(get_current_user)):
-    item = get_checklist_item(db, item_id)
-    if not item:
+    # UPDATE conditionnel ... RETURNING ; la 2e requête ne sert qu'à distinguer 404 / 403
+    item = complete_checklist_item_if_allowed(db, item_id, auth_user)
+    if item:
+        return item
+    if not checklist_item_exists(db, item_id):
         raise HTTPException(status_code=404, detail="Item not found")
-
-    if item.user_id == auth_user.id:
-        return mark_item_completed(db, item_id)
-
-    target_user = get_user_by_id(db, item.user_id) if item.user_id else None
-
-    if auth_user.role in ("SUPERADMIN", "RH"):
-        return mark_item_completed(db, item_id)
-
-    if auth_user.role in ("DEPT", "MANAGER")  and target_user and auth_user.department_id == target_user.department_id:
-        return mark_item_completed(db, item_id)
-
     raise HTTPException(status_code=403, detail="Not allowed to complete this item")
 
 
@@ -209,27 +422,20 @@ def complete_item(item_id: int, db: Session = Depends(get_db), auth_user=Depends
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_item(
     item_id: int,
+    background_tasks: BackgroundTasks,
+    response: Response,
     db: Session = Depends(get_db),
     auth_user=Depends(get_current_user),
 ):
-    item = get_checklist_item(db, item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    target_user = get_user_by_id(db, item.user_id) if item.user_id else None
-
-    allowed = False
-    if auth_user.role in ("SUPERADMIN", "RH"):
-        allowed = True
-    elif auth_user.role in ("DEPT", "MANAGER") and target_user and auth_user.department_id == target_user.department_id:
-        allowed = True
-
-    if not allowed:
+    deleted = delete_checklist_item_if_allowed(db, item_id, auth_user)
+    if not deleted:
+        if not checklist_item_exists(db, item_id):
+            raise HTTPException(status_code=404, detail="Item not found")
         raise HTTPException(status_code=403, detail="Not allowed to delete this item")
 
-    deleted = delete_checklist_item(db, item_id)
-    if not deleted:
-        raise HTTPException(status_code=500, detail="Unable to delete item")
+    user_id, title, department_id = deleted
+    if user_id is None:
+        schedule_propagation(db, background_tasks, response, "delete", title, department_id)
     return None
 
 
@@ -1,5 +1,5 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -8,11 +8,16 @@ from app.schemas.department import DepartmentCreate, DepartmentOut, DepartmentUp
 from app.crud.department_crud import (
     create_department,
     list_departments,
+    count_departments,
+    DEPARTMENT_PAGE_KEYS,
     get_department,
     update_department,
     delete_department,
 )
 from app.api.dependencies import require_role
+from app.api.etags import not_modified
+from app.api.pagination import PageParams, set_page_headers
+from app.services.read_cache import DEPARTMENTS, read_cache
 
 router = APIRouter(prefix="/departments", tags=["departments"])
 
@@ -28,10 +33,22 @@ def create_dept(
 
 @router.get("/", response_model=List[DepartmentOut])
 def get_departments(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     auth_user=Depends(require_role(["SUPERADMIN", "RH", "DEPT", "MANAGER"])),
 ):
-    return list_departments(db)
+    unchanged = not_modified(request, response, "departments", read_cache.version(DEPARTMENTS),
+                             skip, limit, page.cursor, page.with_total)
+    if unchanged:
+        return unchanged
+    depts = list_departments(db, skip=skip, limit=limit, cursor=page.cursor)
+    total = count_departments(db) if page.with_total else None
+    set_page_headers(response, depts, DEPARTMENT_PAGE_KEYS, limit, total)
+    return depts
 
 
 @router.get("/{dept_id}", response_model=DepartmentOut)
@@ -3,34 +3,97 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.core.config import settings
 from app.core.security import decode_access_token
+from app.crud.user_crud import get_user_by_id
 from app.models.user import User
+from app.schemas.user import Principal
+from app.services.principal_cache import principal_cache
+from app.services.token_versions import token_versions
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_or_401(token: str) -> dict:
     try:
         payload = decode_access_token(token)
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        if payload is None or payload.get("sub") is None:
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return payload
+
+
+def _check_token_version(payload: dict, user: User) -> None:
+    # token émis avant une révocation (changement de rôle, mot de passe, ...)
+    if "ver" in payload and payload["ver"] != (user.token_version or 0):
+        raise _credentials_exception()
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+
+def _principal_from_user(user: User) -> Principal:
+    return Principal(id=user.id, role=user.role, department_id=user.department_id,
+                     token_version=user.token_version or 0)
+
+
+def _principal_from_claims(payload: dict, current_version) -> Principal:
+    if current_version is None or current_version != payload["ver"]:
+        raise _credentials_exception()
+    return Principal(id=int(payload["sub"]), role=payload["role"], department_id=payload.get("dept"),
+                     token_version=payload["ver"])
+
+
+def _check_role(user, required_roles: list):
+    user_role_value = getattr(user.role, "value", user.role)
+    if user_role_value not in required_roles:
+        raise HTTPException(status_code=403, detail="Operation not permitted")
+    return user
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    # Chemin chaud : token déjà vérifié, aucune requête DB
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached[1]
+
+    payload = _decode_or_401(token)
+    user_id = int(payload["sub"])
+
+    generation = principal_cache.generation(user_id)
+    # passe par le loader : le handler qui relit ce user ne refait pas de requête
+    user = get_user_by_id(db, user_id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    _check_token_version(payload, user)
+    principal_cache.set(token, payload, user, generation)
     return user
 
+
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """
+    Identité construite à partir des claims signés du JWT.
+    Seule la token_version est vérifiée, via un cache en mémoire : pas de chargement du User.
+    """
+    payload = _decode_or_401(token)
+    user_id = int(payload["sub"])
+
+    # ancien token sans claims de version : on retombe sur le chargement du user
+    if "ver" not in payload:
+        return _principal_from_user(get_current_user(token, db))
+
+    return _principal_from_claims(payload, token_versions.get(db, user_id))
+
+
 def require_role(required_roles: list):
-    def role_checker(user: User = Depends(get_current_user)):
-        user_role_value = getattr(user.role, "value", user.role)
-        if user_role_value not in required_roles:
-            raise HTTPException(status_code=403, detail="Operation not permitted")
-        return user
+    auth_dependency = get_current_principal if settings.AUTH_TRUST_TOKEN_CLAIMS else get_current_user
+
+    def role_checker(user=Depends(auth_dependency)):
+        return _check_role(user, required_roles)
     return role_checker
@@ -1,25 +1,43 @@
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, status, Query, Request, Response
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional
+from typing import List, Literal, Optional
 import os
 import shutil
 
 from app.db.session import get_db
+from app.db.unit_of_work import after_commit, after_rollback
 from app.crud.document_crud import (
     create_document_record,
     list_documents,
+    count_documents,
+    DOCUMENT_PAGE_KEYS,
+    DOCUMENT_OUT_COLUMNS,
     get_document,
     update_document_record,
     delete_document_record,
 )
 from app.schemas.document import DocumentOut, DocumentUpdate
 from app.api.dependencies import require_role, get_current_user
-from app.services.file_storage import save_upload_file
+from app.api.etags import not_modified, visibility_scope
+from app.api.pagination import PageParams, set_page_headers
+from app.api.fieldsets import sparse_fields
+from app.api.responses import export_response, fast_columns, list_response, partial_response
+from app.services.exports import documents_export, stream_export
+from app.services.read_cache import DOCUMENTS, read_cache
+from app.services.file_storage import precompressed_variant, save_upload_file, sidecar_paths, write_precompressed
 from app.core.config import settings
 
+
+def remove_file_quietly(path: Optional[str]) -> None:
+    # best-effort : un fichier orphelin ne doit pas faire échouer la requête
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+    except Exception:
+        pass
+
 STORAGE_DIR =  settings.STORAGE_DIR
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -30,6 +48,7 @@ router = APIRouter(prefix="/documents", tags=["documents"])
 
 @router.post("/", response_model=DocumentOut, status_code=status.HTTP_201_CREATED)
 def upload_document(
+    background_tasks: BackgroundTasks,
     title: str,
     department_id: Optional[int] = None,
     file: UploadFile = File(...),
@@ -63,6 +82,9 @@ def upload_document(
             detail=f"Failed to save uploaded file: {exc}"
         )
 
+    # si la transaction de la requête est annulée, le fichier n'a plus de raison d'être
+    after_rollback(db, remove_file_quietly, path)
+
     # Create DB record
     try:
         doc = create_document_record(
@@ -75,24 +97,27 @@ def upload_document(
             uploaded_by=auth_user.id,
             department_id=department_id,
         )
-        return doc
     except Exception as exc:
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-        except Exception:
-            pass
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create document record: {exc}"
         )
 
+    if settings.DOCUMENT_PRECOMPRESS:
+        # après la réponse (donc après le COMMIT) ; d'ici là le middleware compresse à la volée
+        background_tasks.add_task(write_precompressed, path, file.content_type)
+    return doc
+
 
 @router.get("/", response_model=List[DocumentOut])
 def get_docs(
+    request: Request,
+    response: Response,
     department_id: Optional[int] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(DocumentOut)),
     db: Session = Depends(get_db),
     auth_user = Depends(get_current_user),
 ):
@@ -105,28 +130,39 @@ def get_docs(
     user_role = getattr(auth_user, "role", None)
     user_dept = getattr(auth_user, "department_id", None)
 
-    if user_role in ("SUPERADMIN", "RH"):
-        # full access, allow optional department filter
-        return list_documents(db, department_id=department_id, skip=skip, limit=limit)
-
     # Non-admin: cannot ask for other departments explicitly
-    if department_id is not None and department_id != user_dept:
+    if user_role not in ("SUPERADMIN", "RH") and department_id is not None and department_id != user_dept:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Cannot access documents of other department")
 
-    # return global (None) OR same department
-    q = db.query  # just for typing clarity below
-    docs = db.query  # not needed but keep clarity
-    from app.models.document import Document  # local import to avoid circular issues
-    docs = db.query(Document).filter(
-        or_(Document.department_id == None, Document.department_id == user_dept)
-    ).offset(skip).limit(limit).all()
-    return docs
+    # même version des documents, même périmètre, mêmes paramètres → 304 sans requête
+    unchanged = not_modified(request, response, "documents", read_cache.version(DOCUMENTS), visibility_scope(auth_user),
+                             department_id, skip, limit, page.cursor, page.with_total, fields)
+    if unchanged:
+        return unchanged
+
+    # scope SQL : admin → tout ; sinon global (None) OR même département
+    columns = fast_columns(DOCUMENT_OUT_COLUMNS, fields)
+    docs = list_documents(db, department_id=department_id, skip=skip, limit=limit, cursor=page.cursor,
+                          principal=auth_user, columns=columns)
+    total = count_documents(db, department_id=department_id, principal=auth_user) if page.with_total else None
+    set_page_headers(response, docs, DOCUMENT_PAGE_KEYS, limit, total)
+    return list_response(docs, columns, response)
+
+
+@router.get("/export")
+def export_docs(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    auth_user=Depends(get_current_user),
+):
+    # métadonnées seulement (pas les fichiers), même périmètre que la liste
+    return export_response(stream_export(documents_export(auth_user), fmt), fmt, "documents")
 
 
 @router.get("/{doc_id}", response_model=DocumentOut)
 def get_doc(
     doc_id: int,
+    fields: Optional[List[str]] = Depends(sparse_fields(DocumentOut)),
     db: Session = Depends(get_db),
     auth_user = Depends(get_current_user),
 ):
@@ -140,12 +176,13 @@ def get_doc(
         if auth_user.department_id != doc.department_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No access to this document")
 
-    return doc
+    return partial_response(doc, DocumentOut, fields)
 
 
 @router.get("/{doc_id}/download")
 def download_doc(
     doc_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     auth_user = Depends(get_current_user),
 ):
@@ -161,6 +198,11 @@ def download_doc(
     if not doc.path or not os.path.exists(doc.path):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="File missing on server")
 
+    variant = precompressed_variant(doc.path, request.headers.get("accept-encoding", ""))
+    if variant:
+        sidecar, encoding = variant
+        return FileResponse(path=sidecar, filename=doc.original_filename, media_type=doc.content_type,
+                            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
     return FileResponse(path=doc.path, filename=doc.original_filename, media_type=doc.content_type)
 
 
@@ -220,13 +262,9 @@ def delete_doc(
                 detail="Not allowed to delete documents of another department"
             )
 
-    # remove file from disk first (best-effort)
-    try:
-        if doc.path and os.path.exists(doc.path):
-            os.remove(doc.path)
-    except Exception:
-        # log in real app
-        pass
+    # le fichier n'est retiré du disque qu'une fois la suppression validée en base
+    for path in (doc.path, *sidecar_paths(doc.path)):
+        after_commit(db, remove_file_quietly, path)
 
     deleted = delete_document_record(db, doc_id)
     if not deleted:
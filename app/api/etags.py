@@ -0,0 +1,54 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.crud.scoping import is_admin
+from app.services.read_cache import ONBOARDING, read_cache, user_checklist_namespace
+
+
+def weak_etag(*parts: Any) -> str:
+    """ETag faible dérivé des compteurs de version et des paramètres qui déterminent la réponse."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def visibility_scope(principal) -> tuple:
+    # deux appelants du même périmètre voient la même liste
+    return ("admin",) if is_admin(principal) else ("dept", principal.department_id)
+
+
+def my_checklist_version(user_id: int) -> tuple:
+    # checklist du user + changements en masse (propagation, plans) ; aucune requête DB
+    return ("me", user_id, settings.ONBOARDING_MODE,
+            read_cache.version(user_checklist_namespace(user_id)), read_cache.version(ONBOARDING))
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # comparaison faible : on ignore le préfixe W/
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, *parts: Any) -> Optional[Response]:
+    """
+    Pose l'ETag sur la réponse ; si le client a déjà cette version, retourne un 304
+    à renvoyer tel quel (ni requête de liste ni sérialisation Pydantic).
+    """
+    etag = weak_etag(read_cache.epoch(), *parts)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
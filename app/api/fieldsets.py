@@ -0,0 +1,22 @@
+from fastapi import HTTPException, Query
+from typing import List, Optional
+
+
+def sparse_fields(schema):
+    """
+    Dépendance ?fields=id,title : champs de `schema` à renvoyer (dans l'ordre du schéma),
+    ou None pour tous. Un champ inconnu → 400.
+    """
+    known = list(schema.__fields__)
+
+    def parse(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(known)}"),
+    ) -> Optional[List[str]]:
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested.difference(known))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return [name for name in known if name in requested] or None
+    return parse
@@ -0,0 +1,22 @@
+
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import require_role
+from app.core.hashing import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.read_cache import read_cache
+from app.services.token_revocation import revoked_tokens
+from app.services.token_versions import token_versions
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/")
+def get_metrics(auth_user=Depends(require_role(["SUPERADMIN"]))):
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "token_versions": token_versions.stats(),
+        "revoked_tokens": revoked_tokens.stats(),
+        "read_cache": read_cache.stats(),
+    }
@@ -0,0 +1,26 @@
+from fastapi import Query, Response
+from typing import Optional, Sequence
+
+from app.crud.pagination import next_cursor
+
+
+class PageParams:
+    """Paramètres communs des listes paginées par curseur."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned in X-Next-Cursor"),
+        with_total: bool = Query(False, description="Compute X-Total-Count (extra COUNT query)"),
+    ):
+        self.cursor = cursor
+        self.with_total = with_total
+
+
+def set_page_headers(response: Response, items: Sequence, keys: Sequence, limit: int,
+                     total: Optional[int] = None) -> None:
+    # le corps reste une liste (compatibilité clients) ; la pagination passe par les en-têtes
+    cursor = next_cursor(items, keys, limit)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.core.config import settings
+from app.db.session import get_db
+from app.schemas.progress import CompanyProgressOut, DepartmentProgressOut, UserProgressOut
+from app.crud.progress_crud import company_progress, get_user_progress, list_department_progress, progress_dict
+from app.crud.scoping import ADMIN_ROLES, DEPARTMENT_ROLES, role_of
+from app.crud.user_crud import get_user_by_id
+from app.api.dependencies import get_current_user, require_role
+
+def counters_available():
+    # en mode "plan", l'avancement est dans user_step_progress : les compteurs ne le reflètent pas
+    if settings.ONBOARDING_MODE == "plan":
+        raise HTTPException(status_code=409, detail="Progress counters are not available in plan mode")
+
+
+# Avancement de l'onboarding, lu dans les compteurs (app/crud/progress_crud.py)
+router = APIRouter(prefix="/progress", tags=["progress"], dependencies=[Depends(counters_available)])
+
+
+@router.get("/users/{user_id}", response_model=UserProgressOut)
+def user_progress(user_id: int, db: Session = Depends(get_db), auth_user=Depends(get_current_user)):
+    target = get_user_by_id(db, user_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # mêmes droits que la checklist du user : lui-même, SUPERADMIN/RH, DEPT/MANAGER du département
+    role = role_of(auth_user)
+    if not (
+        auth_user.id == user_id
+        or role in ADMIN_ROLES
+        or (role in DEPARTMENT_ROLES and auth_user.department_id == target.department_id)
+    ):
+        raise HTTPException(status_code=403, detail="Not allowed to view this user's progress")
+    return get_user_progress(db, target)
+
+
+@router.get("/departments", response_model=List[DepartmentProgressOut])
+def departments_progress(
+    db: Session = Depends(get_db),
+    auth_user=Depends(require_role(["SUPERADMIN", "RH", "MANAGER", "DEPT"])),
+):
+    # DEPT/MANAGER : seulement leur département
+    if role_of(auth_user) in ADMIN_ROLES:
+        return list_department_progress(db, all_departments=True)
+    return list_department_progress(db, auth_user.department_id)
+
+
+@router.get("/departments/{department_id}", response_model=DepartmentProgressOut)
+def department_progress(
+    department_id: int,
+    db: Session = Depends(get_db),
+    auth_user=Depends(require_role(["SUPERADMIN", "RH", "MANAGER", "DEPT"])),
+):
+    if role_of(auth_user) not in ADMIN_ROLES and auth_user.department_id != department_id:
+        raise HTTPException(status_code=403, detail="Not allowed to view another department")
+    rows = list_department_progress(db, department_id)
+    if not rows:
+        # aucun user du département n'a d'item
+        return progress_dict(0, 0, None, department_id=department_id, users=0)
+    return rows[0]
+
+
+@router.get("/company", response_model=CompanyProgressOut)
+def company_wide_progress(db: Session = Depends(get_db), auth_user=Depends(require_role(["SUPERADMIN", "RH"]))):
+    return company_progress(db)
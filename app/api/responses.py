@@ -0,0 +1,91 @@
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.config import settings
+from app.crud.projections import rows_to_dicts
+
+try:  # dépendance optionnelle : encodeur natif, beaucoup plus rapide que json
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # mêmes conversions que l'encodeur de FastAPI pour les types rencontrés dans nos lignes
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON encodée par orjson si disponible, sinon par json (sans espaces)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_list_response(items: List[Dict], response: Response) -> Response:
+    """
+    Lignes déjà projetées sur le schéma de sortie (colonnes SQL de confiance) :
+    encodées telles quelles, sans validation Pydantic ligne par ligne.
+    Les en-têtes posés sur `response` (pagination, ETag) sont recopiés.
+    """
+    fast = FastJSONResponse(items)
+    for name, value in response.headers.items():
+        if name not in ("content-length", "content-type"):
+            fast.headers[name] = value
+    return fast
+
+
+def fast_columns(columns: Sequence, fields: Optional[Sequence[str]] = None) -> Optional[Sequence]:
+    """
+    Colonnes à projeter pour le chemin rapide, ou None (objets ORM + response_model).
+    Avec `fields` (?fields=), seulement ces colonnes, quel que soit FAST_JSON_LISTS.
+    """
+    if fields:
+        return [c for c in columns if c.key in fields]
+    return columns if settings.FAST_JSON_LISTS else None
+
+
+def list_response(rows, columns: Optional[Sequence], response: Response, head: Sequence[Dict] = ()):
+    """
+    Réponse d'une route de liste. `head` : éléments déjà au format du schéma placés en tête
+    (étapes du plan d'onboarding). columns None : lignes ORM, validées et sérialisées par le
+    response_model de la route.
+    """
+    if columns is None:
+        return [*head, *rows] if head else rows
+    names = [c.key for c in columns]
+    head = [{name: item[name] for name in names} for item in head]
+    return fast_list_response([*head, *rows_to_dicts(rows, columns)], response)
+
+
+def partial_response(content, schema, fields: Optional[Sequence[str]]):
+    """Objet ORM (ou liste) réduit aux champs demandés ; sans `fields`, rendu par le response_model."""
+    if not fields:
+        return content
+    include = set(fields)
+    if isinstance(content, list):
+        return FastJSONResponse([schema.from_orm(obj).dict(include=include) for obj in content])
+    return FastJSONResponse(schema.from_orm(content).dict(include=include))
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def export_response(chunks: Iterator[bytes], fmt: str, name: str) -> StreamingResponse:
+    # envoyé au fil de la lecture : ni Content-Length ni corps complet en mémoire
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
 from app.db.session import get_db
-from app.schemas.user import UserCreate, UserOut, UserUpdate
-from app.crud.user_crud import create_user, list_users, get_user_by_id, update_user, delete_user
+from app.schemas.user import UserCreate, UserImportReport, UserOut, UserUpdate
+from app.crud.user_crud import (
+    create_user, list_users, count_users, get_user_by_id, update_user, delete_user, USER_PAGE_KEYS,
+    USER_OUT_COLUMNS,
+)
 from app.api.dependencies import get_current_user, require_role
+from app.api.pagination import PageParams, set_page_headers
+from app.api.fieldsets import sparse_fields
+from app.api.responses import export_response, fast_columns, list_response, partial_response
 from app.services.onboarding import assign_onboarding_for_user
 from app.services.email_service import send_welcome_email
+from app.services.exports import stream_export, users_export
+from app.services.user_import import detect_format, import_users
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -25,25 +33,54 @@ def create_new_user(
     return user
 
 
+# ✅ IMPORT EN MASSE (CSV / NDJSON, seulement SUPERADMIN)
+@router.post("/import", response_model=UserImportReport)
+def import_users_route(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    auth_user=Depends(require_role(["SUPERADMIN"])),
+):
+    fmt = detect_format(file.filename, file.content_type)
+    report, created = import_users(db, file.file, fmt)
+    for user in created:
+        background_tasks.add_task(send_welcome_email, user["email"], user["name"])
+    return report
+
+
 # ✅ READ ALL
 @router.get("/", response_model=List[UserOut])
 def get_users(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    page: PageParams = Depends(),
+    fields: Optional[List[str]] = Depends(sparse_fields(UserOut)),
     db: Session = Depends(get_db),
     auth_user=Depends(require_role(["SUPERADMIN", "RH", "MANAGER", "DEPT"])),
 ):
-    all_users = list_users(db)
-
-    # MANAGER / DEPT → seulement leur département
-    if auth_user.role in ("MANAGER", "DEPT"):
-        return [u for u in all_users if u.department_id == auth_user.department_id]
-
-    return all_users
+    # MANAGER / DEPT → seulement leur département (filtré en SQL)
+    columns = fast_columns(USER_OUT_COLUMNS, fields)
+    users = list_users(db, skip=skip, limit=limit, cursor=page.cursor, principal=auth_user, columns=columns)
+    total = count_users(db, principal=auth_user) if page.with_total else None
+    set_page_headers(response, users, USER_PAGE_KEYS, limit, total)
+    return list_response(users, columns, response)
+
+
+# ✅ EXPORT (flux NDJSON / CSV, sans limite de taille)
+@router.get("/export")
+def export_users(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    auth_user=Depends(require_role(["SUPERADMIN", "RH", "MANAGER", "DEPT"])),
+):
+    return export_response(stream_export(users_export(auth_user), fmt), fmt, "users")
 
 
 # ✅ READ ONE
 @router.get("/{user_id}", response_model=UserOut)
 def get_user(
     user_id: int,
+    fields: Optional[List[str]] = Depends(sparse_fields(UserOut)),
     db: Session = Depends(get_db),
     auth_user=Depends(get_current_user),
 ):
@@ -59,7 +96,7 @@ def get_user(
     if auth_user.role in ("MANAGER", "DEPT") and auth_user.department_id != user.department_id:
         raise HTTPException(status_code=403, detail="Cannot access user from another department")
 
-    return user
+    return partial_response(user, UserOut, fields)
 
 
 # ✅ UPDATE
@@ -0,0 +1,187 @@
+import zlib
+from typing import Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:  # dépendances optionnelles : br / zstd proposés seulement si installés
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# types textuels ; les PDF, images, archives... sont déjà compressés et passent tels quels
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "+json", "+xml",
+)
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return any(media_type.startswith(t) if t.endswith("/") else t in media_type for t in COMPRESSIBLE_TYPES)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._c = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        out = self._c.process(data)
+        return out + self._c.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._c = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        out = self._c.compress(data)
+        return out + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+# encodage -> (compresseur, niveau à la volée, niveau pour les fichiers pré-compressés)
+COMPRESSORS = {"gzip": (_Gzip, 6, 9)}
+if brotli is not None:
+    COMPRESSORS["br"] = (_Brotli, 4, 9)
+if zstandard is not None:
+    COMPRESSORS["zstd"] = (_Zstd, 3, 12)
+
+
+def new_compressor(encoding: str, level: Optional[int] = None):
+    factory, default_level, _ = COMPRESSORS[encoding]
+    return factory(default_level if level is None else level)
+
+
+def negotiate(accept_encoding: str, preferred: Sequence[str]) -> Optional[str]:
+    """Premier encodage de `preferred` accepté par le client (q > 0), ou None."""
+    accepted = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in preferred:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compression des réponses textuelles au-delà de `minimum_size` octets, encodage négocié
+    d'après Accept-Encoding. Les réponses en flux (StreamingResponse, FileResponse) sont
+    compressées morceau par morceau, sans être chargées en mémoire.
+    Une réponse qui porte déjà un Content-Encoding (fichier pré-compressé) passe telle quelle.
+    Une réponse compressée ici voit son ETag fort affaibli (W/).
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, encodings: Sequence[str] = ("br", "zstd", "gzip"),
+                 gzip_level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [e for e in encodings if e in COMPRESSORS]
+        self.gzip_level = gzip_level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        # sans l'extension pathsend, FileResponse envoie le fichier en morceaux de corps
+        extensions = {k: v for k, v in scope.get("extensions", {}).items() if k != "http.response.pathsend"}
+        scope = {**scope, "extensions": extensions}
+        level = self.gzip_level if encoding == "gzip" else None
+        await self.app(scope, receive, _CompressingSend(send, encoding, level, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: str, level: Optional[int], minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            length = headers.get("content-length")
+            self.passthrough = (
+                message["status"] in (204, 206, 304)
+                or "content-encoding" in headers
+                or "content-range" in headers
+                or not is_compressible(headers.get("content-type"))
+                or (length is not None and int(length) < self.minimum_size)
+            )
+            if self.passthrough:
+                await self._send(message)
+            # sinon : en-têtes retenus jusqu'au premier morceau du corps
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+            self.compressor = new_compressor(self.encoding, self.level)
+            self.start["headers"] = list(self.start["headers"])
+            headers = MutableHeaders(raw=self.start["headers"])
+            del headers["content-length"]
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # ETag fort = octets identiques : le corps compressé n'en garde qu'une version faible
+                headers["etag"] = "W/" + etag
+            if not more_body:
+                # corps complet : une seule passe, longueur connue
+                data = self.compressor.compress(body, flush=False) + self.compressor.finish()
+                headers["content-length"] = str(len(data))
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": data})
+                return
+            await self._send(self.start)
+
+        # flux : chaque morceau est vidé du compresseur pour arriver au client sans attendre
+        data = self.compressor.compress(body, flush=more_body)
+        if not more_body:
+            data += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -12,9 +12,23 @@ TEMPLATE_DIR = BASE_DIR / "templates" / "emails"
 TEMPLATE_DIR.mkdir(parents=True, exist_ok=True)
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR}/hellofmap.db")
+    # Profil moteur : auto | sqlite | postgres | default
+    DB_ENGINE_PROFILE: str = os.getenv("DB_ENGINE_PROFILE", "auto")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", -64000))  # négatif = en KiB
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+    # Pile async (AsyncEngine + aiosqlite/asyncpg) pour les routes chaudes ; False = tout en sync
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "False").lower() == "true"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change_this_secret_for_dev_only")
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+    # Capacité du filtre de Bloom des refresh tokens révoqués (par génération)
+    REVOKED_TOKEN_BLOOM_CAPACITY: int = int(os.getenv("REVOKED_TOKEN_BLOOM_CAPACITY", 100000))
 
     STORAGE_DIR: str = os.getenv("STORAGE_DIR", os.path.join(BASE_DIR, "..", "storage"))
 
@@ -33,10 +47,55 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", None)
     EMAIL_FROM: str = os.getenv("EMAIL_FROM", "no-reply@example.com")
 
+    # Onboarding : "copy" = templates copiés dans checklist_items pour chaque user,
+    # "plan" = users rattachés à une version de plan + état de complétion creux
+    ONBOARDING_MODE: str = os.getenv("ONBOARDING_MODE", "copy")
+
+    # Cache des principals authentifiés (token -> user)
+    PRINCIPAL_CACHE_MAXSIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", 10000))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 300))
+
+    # Autorisation à partir des claims signés du JWT (role, department_id, ver)
+    AUTH_TRUST_TOKEN_CLAIMS: bool = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "True").lower() == "true"
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = int(os.getenv("TOKEN_VERSION_CACHE_TTL_SECONDS", 30))
+
+    # Limiteur de tentatives (/auth/token, /auth/forgot-password) : "memory" ou "redis"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    LOGIN_RATE_LIMIT_PER_IP: int = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", 30))
+    LOGIN_RATE_LIMIT_PER_IDENTIFIER: int = int(os.getenv("LOGIN_RATE_LIMIT_PER_IDENTIFIER", 5))
+
+    # Compression des réponses textuelles (gzip ; br / zstd si brotli / zstandard installés)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_ENCODINGS: str = os.getenv("COMPRESSION_ENCODINGS", "br,zstd,gzip")  # ordre de préférence
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    # Documents textuels : versions pré-compressées écrites après l'upload
+    DOCUMENT_PRECOMPRESS: bool = os.getenv("DOCUMENT_PRECOMPRESS", "True").lower() == "true"
+
+    # Listes projetées en SQL et encodées par orjson, sans validation Pydantic par ligne
+    FAST_JSON_LISTS: bool = os.getenv("FAST_JSON_LISTS", "True").lower() == "true"
+
+    # Cache des lectures départements / templates : "memory" (par worker) ou "redis" (partagé)
+    READ_CACHE_BACKEND: str = os.getenv("READ_CACHE_BACKEND", "memory")
+    READ_CACHE_REDIS_URL: str = os.getenv("READ_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    READ_CACHE_MAXSIZE: int = int(os.getenv("READ_CACHE_MAXSIZE", 2048))
+    READ_CACHE_TTL_SECONDS: int = int(os.getenv("READ_CACHE_TTL_SECONDS", 300))
+
+    # Pool bcrypt : nb de hash simultanés et profondeur de la file d'attente
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+    PASSWORD_HASH_QUEUE_DEPTH: int = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", 32))
+    # Import en masse : nb de processus pour le hashage parallèle
+    PASSWORD_HASH_PROCESSES: int = int(os.getenv("PASSWORD_HASH_PROCESSES", os.cpu_count() or 2))
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
 
+    @property
+    def compression_encodings(self) -> list:
+        return [e.strip() for e in self.COMPRESSION_ENCODINGS.split(",") if e.strip()]
+
     @property
     def mail_conf(self) -> ConnectionConfig:
         template_path = Path(BASE_DIR) / "templates" / "emails"
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+# Gestion du hashage des mots de passe
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HasherBusyError(Exception):
+    """File d'attente du hasher saturée : la requête doit être rejetée (503)."""
+
+
+class PasswordHasher:
+    """
+    Exécute bcrypt dans un pool de threads dédié (bcrypt relâche le GIL),
+    avec un nombre de workers et une profondeur de file bornés.
+    Au-delà de `workers + queue_depth` opérations en cours, on rejette tout de suite.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._metrics = {
+            "completed": 0,
+            "rejected": 0,
+            "queue_wait_total_ms": 0.0,
+            "queue_wait_max_ms": 0.0,
+            "hash_time_total_ms": 0.0,
+            "hash_time_max_ms": 0.0,
+        }
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_depth:
+                self._metrics["rejected"] += 1
+                raise HasherBusyError("Password hashing queue is full")
+            self._pending += 1
+
+        enqueued_at = time.perf_counter()
+
+        def run():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                self._record(started_at - enqueued_at, finished_at - started_at)
+
+        try:
+            return self._executor.submit(run)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    def _record(self, wait: float, duration: float) -> None:
+        wait_ms, duration_ms = wait * 1000, duration * 1000
+        with self._lock:
+            self._pending -= 1
+            m = self._metrics
+            m["completed"] += 1
+            m["queue_wait_total_ms"] += wait_ms
+            m["queue_wait_max_ms"] = max(m["queue_wait_max_ms"], wait_ms)
+            m["hash_time_total_ms"] += duration_ms
+            m["hash_time_max_ms"] = max(m["hash_time_max_ms"], duration_ms)
+
+    # --- API sync (routes `def`, déjà dans le threadpool de Starlette)
+    def hash(self, password: str) -> str:
+        return self._submit(pwd_context.hash, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(pwd_context.verify, plain_password, hashed_password).result()
+
+    # --- API async (routes `async def`, ne bloque pas l'event loop)
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(pwd_context.verify, plain_password, hashed_password))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            m = dict(self._metrics)
+            pending = self._pending
+        completed = m["completed"] or 1
+        m.update({
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "pending": pending,
+            "queue_wait_avg_ms": m["queue_wait_total_ms"] / completed,
+            "hash_time_avg_ms": m["hash_time_total_ms"] / completed,
+        })
+        return m
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_depth=settings.PASSWORD_HASH_QUEUE_DEPTH,
+)
+
+
+# --- Hashage en masse (imports) : pool de processus, un cœur par worker
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _hash_in_worker(password: str) -> str:
+    # fonction de module : doit être picklable pour le ProcessPoolExecutor
+    return pwd_context.hash(password)
+
+
+def hash_passwords_parallel(passwords: Sequence[str]) -> List[str]:
+    """Hash une liste de mots de passe en parallèle sur plusieurs processus."""
+    global _process_pool
+    if not passwords:
+        return []
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_PROCESSES)
+    chunksize = max(1, len(passwords) // (settings.PASSWORD_HASH_PROCESSES * 4))
+    return list(_process_pool.map(_hash_in_worker, passwords, chunksize=chunksize))
@@ -1,45 +1,98 @@
-from passlib.context import CryptContext
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import jwt, JWTError, ExpiredSignatureError
 from app.core.config import settings
-
-# Gestion du hashage des mots de passe
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.hashing import password_hasher
 
 
+# bcrypt tourne dans le pool dédié (voir app/core/hashing.py)
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.hash_async(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify_async(plain_password, hashed_password)
 
 
 # ----------------------------
 #      ACCESS TOKEN
 # ----------------------------
-def create_access_token(user_id: int, role: str, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(
+    user_id: int,
+    role: str,
+    expires_delta: Optional[timedelta] = None,
+    department_id: Optional[int] = None,
+    token_version: int = 0,
+) -> str:
     """
     Crée un token JWT pour l'authentification.
-    Payload : {'sub': user_id, 'role': role, 'exp': ...}
+    Payload : {'sub': user_id, 'role': role, 'dept': department_id, 'ver': token_version, 'exp': ...}
     """
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    payload = {"sub": str(user_id), "role": role, "exp": expire}
+    payload = {
+        "sub": str(user_id),
+        "role": role,
+        "dept": department_id,
+        "ver": token_version,
+        "exp": expire,
+    }
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
 def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Décode et valide un access token
-    Retourne le payload {'sub': user_id, 'role': role, 'exp': ...} ou None si invalide/expiré
+    Retourne le payload {'sub': user_id, 'role': role, 'dept': ..., 'ver': ..., 'exp': ...} ou None si invalide/expiré
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except ExpiredSignatureError:
+        return None
+    except JWTError:
+        return None
+    # un refresh token ne doit jamais servir d'access token
+    if payload.get("type") == "refresh":
+        return None
+    return payload
+
+
+# ----------------------------
+#      REFRESH TOKEN
+# ----------------------------
+def create_refresh_token(user_id: int, token_version: int = 0) -> Tuple[str, str, datetime]:
+    """
+    Crée un refresh token à usage unique (rotation à chaque /auth/refresh).
+    Payload : {'sub': user_id, 'jti': id unique, 'ver': token_version, 'type': 'refresh', 'exp': ...}
+    Retourne (token, jti, expiration)
+    """
+    jti = uuid.uuid4().hex
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    payload = {"sub": str(user_id), "jti": jti, "ver": token_version, "type": "refresh", "exp": expire}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM), jti, expire
+
+
+def decode_refresh_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Décode un refresh token, retourne le payload ou None si invalide/expiré
     """
     try:
-        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except ExpiredSignatureError:
         return None
     except JWTError:
         return None
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("sub"):
+        return None
+    return payload
 
 
 # ----------------------------
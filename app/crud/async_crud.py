@@ -0,0 +1,106 @@
+
+# Versions async (AsyncSession) des fonctions CRUD utilisées par les routes async.
+# Mêmes signatures et mêmes requêtes que les modules *_crud.py sync.
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.pagination import apply_keyset
+from app.crud.progress_crud import shift_item_progress
+from app.crud.projections import with_columns
+from app.crud.scoping import checklist_item_permission, scope_documents
+from app.services.read_cache import DEPARTMENTS, TEMPLATES, invalidate_on_write, invalidate_user_checklists, read_cache
+from app.crud.department_crud import DEPARTMENT_PAGE_KEYS
+from app.crud.document_crud import DOCUMENT_PAGE_KEYS
+from app.crud.onboarding_plan_crud import plan_view_query
+from app.models.checklist import ChecklistItem
+from app.models.department import Department
+from app.models.document import Document
+from app.models.user import User
+from typing import List, Optional
+
+
+async def count_rows(db: AsyncSession, query) -> int:
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar_one()
+
+
+# ----- users
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
+
+
+# ----- departments
+async def count_departments(db: AsyncSession) -> int:
+    return await read_cache.get_or_load_async(DEPARTMENTS, "count", lambda: count_rows(db, select(Department)))
+
+async def list_departments(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None) -> List[Department]:
+    # même entrée de cache (et mêmes lignes) que department_crud.list_departments
+    async def load():
+        q = apply_keyset(select(Department.id, Department.name), DEPARTMENT_PAGE_KEYS, cursor, limit).offset(skip)
+        return [{"id": dept_id, "name": name} for dept_id, name in await db.execute(q)]
+
+    rows = await read_cache.get_or_load_async(DEPARTMENTS, f"list:{skip}:{limit}:{cursor}", load)
+    return [Department(**row) for row in rows]
+
+
+# ----- documents
+def documents_query(department_id: int = None, principal=None):
+    q = select(Document)
+    if principal is not None:
+        q = scope_documents(q, principal)
+    if department_id is not None:
+        q = q.where(Document.department_id == department_id)
+    return q
+
+async def list_documents(db: AsyncSession, department_id: int = None, skip: int = 0, limit: int = 100,
+                         cursor: str = None, principal=None, columns=None) -> List[Document]:
+    q = apply_keyset(documents_query(department_id, principal), DOCUMENT_PAGE_KEYS, cursor, limit).offset(skip)
+    if columns:
+        return (await db.execute(with_columns(q, columns, DOCUMENT_PAGE_KEYS))).all()
+    result = await db.execute(q)
+    return result.scalars().all()
+
+async def count_documents(db: AsyncSession, department_id: int = None, principal=None) -> int:
+    return await count_rows(db, documents_query(department_id, principal))
+
+
+# ----- checklist items
+async def list_checklist_items_for_user(db: AsyncSession, user_id: int, columns=None) -> List[ChecklistItem]:
+    q = select(ChecklistItem).where(ChecklistItem.user_id == user_id)
+    if columns:
+        return (await db.execute(with_columns(q, columns))).all()
+    result = await db.execute(q)
+    return result.scalars().all()
+
+async def list_plan_view(db: AsyncSession, user_id: int) -> List[tuple]:
+    result = await db.execute(plan_view_query(user_id))
+    return result.all()
+
+async def checklist_item_exists(db: AsyncSession, item_id: int) -> bool:
+    result = await db.execute(select(ChecklistItem.id).where(ChecklistItem.id == item_id))
+    return result.first() is not None
+
+async def complete_checklist_item_if_allowed(db: AsyncSession, item_id: int, principal) -> Optional[ChecklistItem]:
+    stmt = (
+        update(ChecklistItem)
+        .where(ChecklistItem.id == item_id, ChecklistItem.completed.isnot(True),
+               checklist_item_permission(principal, "complete"))
+        .values(completed=True)
+        .returning(ChecklistItem)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.scalars(stmt)
+    item = result.first()
+    if item is None:
+        # déjà terminé : relu avec le droit, sans écriture
+        allowed = case((checklist_item_permission(principal, "complete"), True), else_=False)
+        row = (await db.execute(select(ChecklistItem, allowed).where(ChecklistItem.id == item_id))).first()
+        return row[0] if row is not None and row[1] and row[0].completed else None
+    # les hooks de fin de transaction sont portés par la Session sync sous-jacente
+    if item.user_id is None:
+        invalidate_on_write(db.sync_session, TEMPLATES)
+    else:
+        user_id = item.user_id
+        await db.run_sync(lambda session: shift_item_progress(session, user_id, item_id, completed=1))
+    invalidate_user_checklists(db.sync_session, [item.user_id])
+    return item
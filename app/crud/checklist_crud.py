@@ -1,8 +1,17 @@
 
+from sqlalchemy import case, delete, false, func, insert, literal, or_, update
 from sqlalchemy.orm import Session
 from app.models.checklist import ChecklistItem
-from app.schemas.checklist import ChecklistCreate
-from typing import List, Optional
+from app.schemas.checklist import ChecklistCreate, ChecklistOut
+from app.crud.pagination import apply_keyset
+from app.crud.progress_crud import refresh_user_progress, shift_item_progress
+from app.crud.projections import out_columns, with_columns
+from app.crud.scoping import checklist_item_permission, scope_checklist_items
+from app.services.read_cache import TEMPLATES, invalidate_on_write, invalidate_user_checklists, read_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# taille des lots pour les clauses IN (limite de variables de SQLite)
+BATCH_SIZE = 500
 
 def create_checklist_item(db: Session, item_in: ChecklistCreate) -> ChecklistItem:
     item = ChecklistItem(
@@ -11,55 +20,238 @@ def create_checklist_item(db: Session, item_in: ChecklistCreate) -> ChecklistIte
         user_id=item_in.user_id
     )
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    db.flush()
+    if item.user_id is None:
+        invalidate_on_write(db, TEMPLATES)
+    invalidate_user_checklists(db, [item.user_id])
+    shift_item_progress(db, item.user_id, item.id, total=1, completed=int(bool(item.completed)),
+                        open_after=not item.completed)
     return item
 
 def get_checklist_item(db: Session, item_id: int) -> Optional[ChecklistItem]:
     return db.query(ChecklistItem).filter(ChecklistItem.id == item_id).first()
 
-def list_checklist_items_for_user(db: Session, user_id: int) -> List[ChecklistItem]:
-    return db.query(ChecklistItem).filter(ChecklistItem.user_id == user_id).all()
+CHECKLIST_PAGE_KEYS = (ChecklistItem.id,)
+# completed peut être NULL sur d'anciennes lignes ; source : items de checklist_items
+CHECKLIST_OUT_COLUMNS = out_columns(
+    ChecklistItem, ChecklistOut,
+    completed=func.coalesce(ChecklistItem.completed, false()),
+    source=literal("item"),
+)
+
+def list_checklist_items_for_user(db: Session, user_id: int, columns=None) -> List[ChecklistItem]:
+    q = db.query(ChecklistItem).filter(ChecklistItem.user_id == user_id)
+    return (with_columns(q, columns) if columns else q).all()
+
+def checklist_items_query(db: Session, principal=None):
+    q = db.query(ChecklistItem)
+    return scope_checklist_items(q, principal) if principal is not None else q
+
+def list_all_checklist_items(db: Session, skip: int = 0, limit: int = 100, cursor: str = None,
+                             principal=None, columns=None) -> List[ChecklistItem]:
+    q = apply_keyset(checklist_items_query(db, principal), CHECKLIST_PAGE_KEYS, cursor, limit).offset(skip)
+    return (with_columns(q, columns, CHECKLIST_PAGE_KEYS) if columns else q).all()
+
+def count_checklist_items(db: Session, principal=None) -> int:
+    return checklist_items_query(db, principal).count()
 
-def list_all_checklist_items(db: Session, skip: int = 0, limit: int = 100) -> List[ChecklistItem]:
-    return db.query(ChecklistItem).offset(skip).limit(limit).all()
+TEMPLATE_COLUMNS = ("id", "title", "completed", "user_id", "department_id")
 
 def list_department_template(db: Session, department_id: Optional[int]) -> List[ChecklistItem]:
-    # Templates defined as items with user_id == None
-    q = db.query(ChecklistItem).filter(ChecklistItem.user_id == None)
-    if department_id is None:
-        q = q.filter(ChecklistItem.department_id == None)
+    # Templates defined as items with user_id == None (servis depuis le cache de lecture)
+    def load():
+        q = db.query(ChecklistItem).filter(ChecklistItem.user_id == None)
+        if department_id is None:
+            q = q.filter(ChecklistItem.department_id == None)
+        else:
+            q = q.filter(ChecklistItem.department_id == department_id)
+        return [{name: getattr(item, name) for name in TEMPLATE_COLUMNS} for item in q]
+
+    rows = read_cache.get_or_load(TEMPLATES, f"items:{department_id}", load)
+    return [ChecklistItem(**row) for row in rows]
+
+def list_template_titles(db: Session, department_id: Optional[int]) -> Dict[str, Optional[int]]:
+    """
+    Templates globaux + ceux du département en une requête : {title: department_id}.
+    Un template du département l'emporte sur un template global de même titre.
+    """
+    def load():
+        q = db.query(ChecklistItem.title, ChecklistItem.department_id).filter(ChecklistItem.user_id == None)
+        if department_id is None:
+            q = q.filter(ChecklistItem.department_id == None)
+        else:
+            q = q.filter(or_(ChecklistItem.department_id == None, ChecklistItem.department_id == department_id))
+        templates: Dict[str, Optional[int]] = {}
+        for title, dept_id in q:
+            if title not in templates or dept_id is not None:
+                templates[title] = dept_id
+        return list(templates.items())
+
+    return dict(read_cache.get_or_load(TEMPLATES, f"titles:{department_id}", load))
+
+# --- opérations ensemblistes (INSERT/UPDATE/DELETE groupés) ; sauf pour les INSERT,
+# l'appelant invalide les versions des checklists des users concernés
+def _batches(values: Sequence) -> Iterable[Sequence]:
+    for i in range(0, len(values), BATCH_SIZE):
+        yield values[i:i + BATCH_SIZE]
+
+def _owners(db: Session, item_ids: Sequence[int]) -> set:
+    owners = set()
+    for batch in _batches(list(item_ids)):
+        owners.update(row[0] for row in db.query(ChecklistItem.user_id).filter(ChecklistItem.id.in_(batch)).distinct())
+    return owners
+
+def bulk_delete_checklist_items(db: Session, item_ids: Sequence[int], templates: bool = False) -> None:
+    # templates=True si des templates font partie des ids (invalide le cache de lecture)
+    owners = _owners(db, item_ids)
+    for batch in _batches(list(item_ids)):
+        db.query(ChecklistItem).filter(ChecklistItem.id.in_(batch)).delete(synchronize_session=False)
+    if templates:
+        invalidate_on_write(db, TEMPLATES)
+    refresh_user_progress(db, owners)
+
+def bulk_set_items_department(db: Session, item_ids: Sequence[int], department_id: Optional[int]) -> None:
+    for batch in _batches(list(item_ids)):
+        db.query(ChecklistItem).filter(ChecklistItem.id.in_(batch)).update(
+            {ChecklistItem.department_id: department_id}, synchronize_session=False
+        )
+
+def bulk_create_checklist_items(db: Session, rows: Sequence[dict]) -> None:
+    # executemany : un seul aller-retour par lot
+    for batch in _batches(list(rows)):
+        db.execute(insert(ChecklistItem), list(batch))
+    invalidate_user_checklists(db, [row["user_id"] for row in rows])
+    refresh_user_progress(db, [row["user_id"] for row in rows])
+
+def bulk_update_checklist_items(db: Session, item_ids: Sequence[int], values: dict, templates: bool = False) -> None:
+    # compteurs d'avancement : seulement si l'état ou le propriétaire change
+    owners = _owners(db, item_ids) if {"completed", "user_id"} & set(values) else set()
+    for batch in _batches(list(item_ids)):
+        db.query(ChecklistItem).filter(ChecklistItem.id.in_(batch)).update(values, synchronize_session=False)
+    if templates or values.get("user_id", 0) is None:
+        invalidate_on_write(db, TEMPLATES)
+    refresh_user_progress(db, owners | {values.get("user_id")})
+
+# --- droits évalués en SQL (voir scoping.checklist_item_permission)
+def _allowed_column(principal, action: str):
+    return case((checklist_item_permission(principal, action), True), else_=False).label("allowed")
+
+def checklist_item_exists(db: Session, item_id: int) -> bool:
+    return db.query(ChecklistItem.id).filter(ChecklistItem.id == item_id).first() is not None
+
+def get_checklist_item_with_permission(db: Session, item_id: int, principal, action: str):
+    """Une requête : (item, autorisé) ou None si l'item n'existe pas."""
+    return (
+        db.query(ChecklistItem, _allowed_column(principal, action))
+        .filter(ChecklistItem.id == item_id)
+        .first()
+    )
+
+def list_items_with_permission(db: Session, item_ids: Sequence[int], principal, action: str) -> Dict[int, tuple]:
+    """{id: (id, user_id, title, department_id, autorisé)}, une requête par lot d'ids."""
+    rows = {}
+    for batch in _batches(list(item_ids)):
+        q = (
+            db.query(ChecklistItem.id, ChecklistItem.user_id, ChecklistItem.title,
+                     ChecklistItem.department_id, _allowed_column(principal, action))
+            .filter(ChecklistItem.id.in_(batch))
+        )
+        rows.update({row[0]: tuple(row) for row in q})
+    return rows
+
+def complete_checklist_item_if_allowed(db: Session, item_id: int, principal) -> Optional[ChecklistItem]:
+    """
+    UPDATE ... WHERE id AND droit AND ouvert RETURNING, puis compteurs décalés en relatif :
+    trois instructions pour un item ouvert. Item déjà terminé : relu avec le droit, sans écriture.
+    None si l'item n'existe pas ou n'est pas autorisé.
+    """
+    stmt = (
+        update(ChecklistItem)
+        .where(ChecklistItem.id == item_id, ChecklistItem.completed.isnot(True),
+               checklist_item_permission(principal, "complete"))
+        .values(completed=True)
+        .returning(ChecklistItem)
+        .execution_options(synchronize_session=False)
+    )
+    item = db.scalars(stmt).first()
+    if item is None:
+        row = get_checklist_item_with_permission(db, item_id, principal, "complete")
+        return row[0] if row is not None and row[1] and row[0].completed else None
+    if item.user_id is None:
+        invalidate_on_write(db, TEMPLATES)
     else:
-        q = q.filter(ChecklistItem.department_id == department_id)
-    return q.all()
+        shift_item_progress(db, item.user_id, item.id, completed=1)
+    invalidate_user_checklists(db, [item.user_id])
+    return item
+
+def delete_checklist_item_if_allowed(db: Session, item_id: int, principal) -> Optional[tuple]:
+    """DELETE conditionnel ; retourne (user_id, title, department_id) de l'item supprimé, ou None."""
+    stmt = (
+        delete(ChecklistItem)
+        .where(ChecklistItem.id == item_id, checklist_item_permission(principal, "delete"))
+        .returning(ChecklistItem.user_id, ChecklistItem.title, ChecklistItem.department_id, ChecklistItem.completed)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = db.execute(stmt).first()
+    if deleted is None:
+        return None
+    user_id, title, department_id, completed = deleted
+    if user_id is None:
+        invalidate_on_write(db, TEMPLATES)
+    invalidate_user_checklists(db, [user_id])
+    shift_item_progress(db, user_id, item_id, total=-1, completed=-int(bool(completed)))
+    return user_id, title, department_id
 
 def mark_item_completed(db: Session, item_id: int) -> Optional[ChecklistItem]:
     item = get_checklist_item(db, item_id)
     if item:
+        was_open = not item.completed
         item.completed = True
-        db.commit()
-        db.refresh(item)
+        db.flush()
+        if item.user_id is None:
+            invalidate_on_write(db, TEMPLATES)
+        invalidate_user_checklists(db, [item.user_id])
+        if was_open:
+            shift_item_progress(db, item.user_id, item.id, completed=1)
     return item
 
-def update_checklist_item(db: Session, item_id: int, payload: dict) -> Optional[ChecklistItem]:
-    item = get_checklist_item(db, item_id)
-    if not item:
-        return None
+def apply_checklist_item_changes(db: Session, item: ChecklistItem, payload: dict) -> ChecklistItem:
+    was_template = item.user_id is None
+    old_user_id, was_completed = item.user_id, bool(item.completed)
 
     # applique uniquement les champs envoyés
     for field, value in payload.items():
         if value is not None:  # ne change que si une valeur est donnée
             setattr(item, field, value)
 
-    db.commit()
-    db.refresh(item)
+    db.flush()
+    if was_template or item.user_id is None:
+        invalidate_on_write(db, TEMPLATES)
+    invalidate_user_checklists(db, [old_user_id, item.user_id])
+    # compteurs en relatif : l'item quitte l'ancien propriétaire et rejoint le nouveau
+    completed = bool(item.completed)
+    if item.user_id != old_user_id:
+        shift_item_progress(db, old_user_id, item.id, total=-1, completed=-int(was_completed))
+        shift_item_progress(db, item.user_id, item.id, total=1, completed=int(completed), open_after=not completed)
+    elif completed != was_completed:
+        shift_item_progress(db, item.user_id, item.id, completed=1 if completed else -1, open_after=not completed)
     return item
 
+def update_checklist_item(db: Session, item_id: int, payload: dict) -> Optional[ChecklistItem]:
+    item = get_checklist_item(db, item_id)
+    if not item:
+        return None
+    return apply_checklist_item_changes(db, item, payload)
+
 
 def delete_checklist_item(db: Session, item_id: int) -> Optional[ChecklistItem]:
     item = get_checklist_item(db, item_id)
     if not item:
         return None
     db.delete(item)
-    db.commit()
+    db.flush()
+    if item.user_id is None:
+        invalidate_on_write(db, TEMPLATES)
+    invalidate_user_checklists(db, [item.user_id])
+    shift_item_progress(db, item.user_id, item.id, total=-1, completed=-int(bool(item.completed)))
     return item
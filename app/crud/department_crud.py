@@ -2,6 +2,9 @@
 from sqlalchemy.orm import Session
 from app.models.department import Department
 from app.schemas.department import DepartmentCreate, DepartmentUpdate
+from app.crud.loaders import loader_for
+from app.crud.pagination import apply_keyset
+from app.services.read_cache import DEPARTMENTS, invalidate_on_write, read_cache
 from typing import List, Optional
 
 def create_department(db: Session, dept_in: DepartmentCreate) -> Department:
@@ -11,15 +14,26 @@ def create_department(db: Session, dept_in: DepartmentCreate) -> Department:
         return existing
     dept = Department(name=dept_in.name)
     db.add(dept)
-    db.commit()
-    db.refresh(dept)
+    db.flush()
+    invalidate_on_write(db, DEPARTMENTS)
     return dept
 
 def get_department(db: Session, dept_id: int) -> Optional[Department]:
-    return db.query(Department).filter(Department.id == dept_id).first()
+    return loader_for(db, Department).load(dept_id)
 
-def list_departments(db: Session, skip: int = 0, limit: int = 100) -> List[Department]:
-    return db.query(Department).offset(skip).limit(limit).all()
+DEPARTMENT_PAGE_KEYS = (Department.id,)
+
+def list_departments(db: Session, skip: int = 0, limit: int = 100, cursor: str = None) -> List[Department]:
+    # page servie depuis le cache de lecture : instances détachées, reconstruites à chaque appel
+    def load():
+        q = apply_keyset(db.query(Department.id, Department.name), DEPARTMENT_PAGE_KEYS, cursor, limit)
+        return [{"id": dept_id, "name": name} for dept_id, name in q.offset(skip)]
+
+    rows = read_cache.get_or_load(DEPARTMENTS, f"list:{skip}:{limit}:{cursor}", load)
+    return [Department(**row) for row in rows]
+
+def count_departments(db: Session) -> int:
+    return read_cache.get_or_load(DEPARTMENTS, "count", lambda: db.query(Department).count())
 
 def update_department(db: Session, dept_id: int, dept_in: DepartmentUpdate) -> Optional[Department]:
     dept = db.query(Department).filter(Department.id == dept_id).first()
@@ -27,8 +41,8 @@ def update_department(db: Session, dept_id: int, dept_in: DepartmentUpdate) -> O
         return None
     if dept_in.name is not None:
         dept.name = dept_in.name
-    db.commit()
-    db.refresh(dept)
+    db.flush()
+    invalidate_on_write(db, DEPARTMENTS)
     return dept
 
 def delete_department(db: Session, dept_id: int) -> Optional[Department]:
@@ -36,5 +50,6 @@ def delete_department(db: Session, dept_id: int) -> Optional[Department]:
     if not dept:
         return None
     db.delete(dept)
-    db.commit()
+    db.flush()
+    invalidate_on_write(db, DEPARTMENTS)
     return dept
@@ -1,6 +1,11 @@
 
 from sqlalchemy.orm import Session
 from app.models.document import Document
+from app.crud.pagination import apply_keyset
+from app.crud.projections import out_columns, with_columns
+from app.crud.scoping import scope_documents
+from app.schemas.document import DocumentOut
+from app.services.read_cache import DOCUMENTS, invalidate_on_write
 from typing import Optional
 
 def create_document_record(db: Session, title: str, stored_filename: str, original_filename: str,
@@ -15,18 +20,32 @@ def create_document_record(db: Session, title: str, stored_filename: str, origin
         department_id=department_id
     )
     db.add(doc)
-    db.commit()
-    db.refresh(doc)
+    db.flush()
+    invalidate_on_write(db, DOCUMENTS)
     return doc
 
 def get_document(db: Session, doc_id: int) -> Optional[Document]:
     return db.query(Document).filter(Document.id == doc_id).first()
 
-def list_documents(db: Session, department_id: int = None, skip: int = 0, limit: int = 100):
+DOCUMENT_PAGE_KEYS = (Document.uploaded_at, Document.id)
+DOCUMENT_OUT_COLUMNS = out_columns(Document, DocumentOut)
+
+def documents_query(db: Session, department_id: int = None, principal=None):
     q = db.query(Document)
+    if principal is not None:
+        q = scope_documents(q, principal)
     if department_id is not None:
         q = q.filter(Document.department_id == department_id)
-    return q.offset(skip).limit(limit).all()
+    return q
+
+def list_documents(db: Session, department_id: int = None, skip: int = 0, limit: int = 100, cursor: str = None,
+                   principal=None, columns=None):
+    # columns : lignes projetées (voir projections.py) au lieu d'objets ORM
+    q = apply_keyset(documents_query(db, department_id, principal), DOCUMENT_PAGE_KEYS, cursor, limit).offset(skip)
+    return (with_columns(q, columns, DOCUMENT_PAGE_KEYS) if columns else q).all()
+
+def count_documents(db: Session, department_id: int = None, principal=None) -> int:
+    return documents_query(db, department_id, principal).count()
 
 def update_document_record(db: Session, doc_id: int, title: Optional[str] = None, department_id: Optional[int] = None):
     doc = db.query(Document).filter(Document.id == doc_id).first()
@@ -36,8 +55,8 @@ def update_document_record(db: Session, doc_id: int, title: Optional[str] = None
         doc.title = title
     if department_id is not None:
         doc.department_id = department_id
-    db.commit()
-    db.refresh(doc)
+    db.flush()
+    invalidate_on_write(db, DOCUMENTS)
     return doc
 
 def delete_document_record(db: Session, doc_id: int):
@@ -46,5 +65,6 @@ def delete_document_record(db: Session, doc_id: int):
         return None
     # Note: caller should remove file from disk if desired
     db.delete(doc)
-    db.commit()
+    db.flush()
+    invalidate_on_write(db, DOCUMENTS)
     return doc
@@ -0,0 +1,74 @@
+
+# Chargement par clé primaire à l'échelle de la requête (la Session est par requête).
+# Un objet déjà présent dans l'identity map de la session est rendu sans requête ;
+# les clés annoncées avec prime() sont chargées ensemble en un seul IN (...).
+# L'identity map ne garde que des références faibles : le loader garde les siennes.
+from typing import Dict, Hashable, Iterable, Optional, Set
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+# taille des lots pour les clauses IN (limite de variables de SQLite)
+BATCH_SIZE = 500
+
+_LOADERS = "loaders"
+
+
+class Loader:
+    def __init__(self, db: Session, model):
+        self.db = db
+        self.model = model
+        self._pk = model.__mapper__.primary_key[0]
+        self._pending: Set[Hashable] = set()
+        self._objects: Dict[Hashable, object] = {}
+        self.queries = 0
+
+    def _cached(self, pk: Hashable):
+        obj = self._objects.get(pk)
+        if obj is None:
+            obj = self.db.identity_map.get(identity_key(self.model, pk))
+        if obj is None:
+            return None
+        state = inspect(obj)
+        if state.deleted or state.was_deleted or state.detached:
+            # supprimé ou sorti de la session depuis le chargement
+            self._objects.pop(pk, None)
+            return None
+        self._objects[pk] = obj
+        return obj
+
+    def prime(self, pks: Iterable[Hashable]) -> None:
+        """Annonce des clés qui seront lues : elles partiront toutes dans la prochaine requête."""
+        self._pending.update(pk for pk in pks if pk is not None and self._cached(pk) is None)
+
+    def _fetch_pending(self) -> None:
+        pending = list(self._pending)
+        self._pending.clear()
+        for i in range(0, len(pending), BATCH_SIZE):
+            for obj in self.db.query(self.model).filter(self._pk.in_(pending[i:i + BATCH_SIZE])):
+                self._objects[getattr(obj, self._pk.key)] = obj
+            self.queries += 1
+
+    def load_many(self, pks: Iterable[Hashable]) -> Dict[Hashable, object]:
+        pks = [pk for pk in pks if pk is not None]
+        self.prime(pks)
+        if self._pending:
+            self._fetch_pending()
+        found = {}
+        for pk in pks:
+            obj = self._cached(pk)
+            if obj is not None:
+                found[pk] = obj
+        return found
+
+    def load(self, pk: Optional[Hashable]):
+        return self.load_many([pk]).get(pk) if pk is not None else None
+
+
+def loader_for(db: Session, model) -> Loader:
+    """Loader du modèle pour cette session (créé au premier appel)."""
+    loaders = db.info.setdefault(_LOADERS, {})
+    if model not in loaders:
+        loaders[model] = Loader(db, model)
+    return loaders[model]
@@ -0,0 +1,183 @@
+
+import datetime
+import hashlib
+import json
+from sqlalchemy import and_, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, aliased
+from app.models.checklist import ChecklistItem
+from app.models.onboarding_plan import OnboardingPlan, OnboardingPlanStep, UserStepProgress
+from app.models.user import User
+from app.crud.checklist_crud import list_template_titles
+from app.services.read_cache import ONBOARDING, invalidate_on_write, invalidate_user_checklists
+from typing import List, Optional
+
+def get_latest_plan(db: Session, department_id: Optional[int]) -> Optional[OnboardingPlan]:
+    return (
+        db.query(OnboardingPlan)
+        .filter(OnboardingPlan.department_id == department_id)
+        .order_by(OnboardingPlan.version.desc())
+        .first()
+    )
+
+def publish_plan(db: Session, department_id: Optional[int]) -> OnboardingPlan:
+    """
+    Fige les templates actuels (globaux + département) dans une nouvelle version,
+    sauf si le contenu est identique à la dernière version publiée.
+    """
+    templates = sorted(list_template_titles(db, department_id).items(), key=lambda t: t[0])
+    content_hash = hashlib.sha256(json.dumps(templates).encode()).hexdigest()
+
+    latest = get_latest_plan(db, department_id)
+    if latest and latest.content_hash == content_hash:
+        return latest
+
+    plan = OnboardingPlan(
+        department_id=department_id,
+        version=(latest.version + 1) if latest else 1,
+        content_hash=content_hash,
+    )
+    db.add(plan)
+    db.flush()
+    if templates:
+        db.execute(insert(OnboardingPlanStep), [
+            {"plan_id": plan.id, "title": title, "department_id": dept_id, "position": position}
+            for position, (title, dept_id) in enumerate(templates)
+        ])
+    return plan
+
+def carry_over_progress(db: Session, user_ids_query, plan_id: int) -> None:
+    """
+    Reporte l'état terminé vers les étapes de même titre du plan `plan_id`
+    (INSERT ... SELECT) pour les users sélectionnés, avant leur bascule de version.
+    """
+    old_step = aliased(OnboardingPlanStep)
+    new_step = aliased(OnboardingPlanStep)
+    progress = aliased(UserStepProgress)  # table cible de l'INSERT : alias pour le NOT EXISTS
+    already = (
+        select(progress.step_id)
+        .where(progress.user_id == User.id, progress.step_id == new_step.id)
+        .exists()
+    )
+    rows = (
+        select(User.id, new_step.id, UserStepProgress.completed_at)
+        .select_from(User)
+        .join(UserStepProgress, UserStepProgress.user_id == User.id)
+        .join(old_step, and_(old_step.id == UserStepProgress.step_id, old_step.plan_id == User.onboarding_plan_id))
+        .join(new_step, and_(new_step.plan_id == plan_id, new_step.title == old_step.title))
+        .where(User.id.in_(user_ids_query), User.onboarding_plan_id != plan_id, ~already)
+    )
+    db.execute(insert(UserStepProgress).from_select(["user_id", "step_id", "completed_at"], rows))
+
+def pin_users_to_plan(db: Session, plan: OnboardingPlan, user_id: Optional[int] = None) -> None:
+    """Rattache un user (ou tous les users du département du plan) à cette version."""
+    if user_id is not None:
+        user_ids = select(User.id).where(User.id == user_id)
+        invalidate_user_checklists(db, [user_id])
+    else:
+        user_ids = select(User.id).where(User.department_id == plan.department_id)
+        invalidate_on_write(db, ONBOARDING)
+    carry_over_progress(db, user_ids, plan.id)
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(onboarding_plan_id=plan.id)
+        .execution_options(synchronize_session=False)
+    )
+
+def set_users_plan(db: Session, user_ids, plan_id: int) -> None:
+    # users tout juste créés : rien à reporter, simple UPDATE groupé
+    user_ids = list(user_ids)
+    invalidate_user_checklists(db, user_ids)
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(onboarding_plan_id=plan_id)
+        .execution_options(synchronize_session=False)
+    )
+
+def current_plan_id_of(user_id: int):
+    # sous-requête : lue en base pour ne pas dépendre d'un snapshot User en cache
+    return select(User.onboarding_plan_id).where(User.id == user_id).scalar_subquery()
+
+def plan_view_query(user_id: int):
+    """Étapes du plan courant du user fusionnées avec son état : (step_id, title, department_id, completed_at)."""
+    return (
+        select(
+            OnboardingPlanStep.id,
+            OnboardingPlanStep.title,
+            OnboardingPlanStep.department_id,
+            UserStepProgress.completed_at,
+        )
+        .outerjoin(UserStepProgress, and_(
+            UserStepProgress.step_id == OnboardingPlanStep.id,
+            UserStepProgress.user_id == user_id,
+        ))
+        .where(OnboardingPlanStep.plan_id == current_plan_id_of(user_id))
+        .order_by(OnboardingPlanStep.position)
+    )
+
+def list_plan_view(db: Session, user_id: int) -> List[tuple]:
+    return db.execute(plan_view_query(user_id)).all()
+
+def is_step_in_current_plan(db: Session, user_id: int, step_id: int) -> bool:
+    row = (
+        db.query(OnboardingPlanStep.id)
+        .filter(OnboardingPlanStep.id == step_id, OnboardingPlanStep.plan_id == current_plan_id_of(user_id))
+        .first()
+    )
+    return row is not None
+
+def complete_plan_step(db: Session, user_id: int, step_id: int) -> None:
+    exists = (
+        db.query(UserStepProgress.step_id)
+        .filter(UserStepProgress.user_id == user_id, UserStepProgress.step_id == step_id)
+        .first()
+    )
+    if not exists:
+        db.add(UserStepProgress(user_id=user_id, step_id=step_id, completed_at=datetime.datetime.utcnow()))
+        db.flush()
+        invalidate_user_checklists(db, [user_id])
+
+# --- passage du mode "copy" au mode "plan"
+def has_copied_template_items(db: Session) -> bool:
+    """Reste-t-il des items copiés d'un template (global ou du département du user) ?"""
+    template = aliased(ChecklistItem)
+    q = (
+        select(ChecklistItem.id)
+        .join(User, User.id == ChecklistItem.user_id)
+        .join(template, and_(
+            template.user_id == None,
+            template.title == ChecklistItem.title,
+            or_(template.department_id == None, template.department_id == User.department_id),
+        ))
+        .limit(1)
+    )
+    return db.execute(q).first() is not None
+
+def copied_items_query():
+    """Items qui doublonnent une étape du plan courant de leur user : (item_id, user_id, step_id)."""
+    return (
+        select(ChecklistItem.id.label("item_id"), ChecklistItem.user_id, OnboardingPlanStep.id.label("step_id"))
+        .join(User, User.id == ChecklistItem.user_id)
+        .join(OnboardingPlanStep, and_(
+            OnboardingPlanStep.plan_id == User.onboarding_plan_id,
+            OnboardingPlanStep.title == ChecklistItem.title,
+        ))
+    )
+
+def import_completed_copies(db: Session) -> None:
+    """Items copiés terminés -> UserStepProgress (INSERT ... SELECT, sans écraser l'existant)."""
+    copies = copied_items_query().where(ChecklistItem.completed == True).subquery()
+    progress = aliased(UserStepProgress)  # table cible de l'INSERT : alias pour le NOT EXISTS
+    already = (
+        select(progress.step_id)
+        .where(progress.user_id == copies.c.user_id, progress.step_id == copies.c.step_id)
+        .correlate(copies)
+        .exists()
+    )
+    rows = (
+        select(copies.c.user_id, copies.c.step_id, literal(datetime.datetime.utcnow()))
+        .where(~already)
+        .distinct()
+    )
+    db.execute(insert(UserStepProgress).from_select(["user_id", "step_id", "completed_at"], rows))
@@ -0,0 +1,54 @@
+
+# Pagination par curseur (keyset) : le curseur encode les valeurs des clés de
+# tri de la dernière ligne reçue. La page suivante filtre "après" ces valeurs
+# au lieu de faire un OFFSET, donc une page profonde coûte autant que la première.
+import base64
+import datetime
+import json
+from sqlalchemy import and_, or_, DateTime
+from typing import Any, List, Optional, Sequence
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise InvalidCursor("Invalid cursor")
+        return [
+            datetime.datetime.fromisoformat(v) if isinstance(k.type, DateTime) and v is not None else v
+            for k, v in zip(keys, values)
+        ]
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def apply_keyset(query, keys: Sequence, cursor: Optional[str], limit: int):
+    """Trie sur `keys` (croissant) et, si un curseur est fourni, ne garde que les lignes suivantes."""
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        # (k1, k2) > (v1, v2)  <=>  k1 > v1 OR (k1 = v1 AND k2 > v2)
+        clauses = []
+        for i, key in enumerate(keys):
+            clauses.append(and_(*[keys[j] == values[j] for j in range(i)], key > values[i]))
+        # borne redondante k1 >= v1 : SQLite n'extrait pas de plage d'index du OR seul (SCAN sinon)
+        query = query.filter(keys[0] >= values[0], or_(*clauses))
+    return query.order_by(*keys).limit(limit)
+
+
+def next_cursor(items: Sequence, keys: Sequence, limit: int) -> Optional[str]:
+    """Curseur de la page suivante, ou None si la page n'est pas pleine."""
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, k.key) for k in keys])
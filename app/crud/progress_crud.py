@@ -0,0 +1,267 @@
+
+# Compteurs d'avancement des checklists (items copiés, mode "copy").
+# Tenus à jour dans la transaction de chaque écriture d'items : décalage relatif pour
+# un item (shift_item_progress), recomptage des users touchés pour les écritures groupées
+# (refresh_user_progress) ; reconcile_progress() les reconstruit entièrement par GROUP BY
+# (python -m app.db.reconcile_progress).
+from typing import Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, insert, null, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.crud.upserts import upsert_insert
+from app.models.checklist import ChecklistItem
+from app.models.progress import DepartmentChecklistProgress, UserChecklistProgress
+from app.models.user import User
+
+# clé de la ligne des users sans département
+NO_DEPARTMENT = 0
+BATCH_SIZE = 500
+
+_COMPLETED = case((ChecklistItem.completed == True, 1), else_=0)
+_OPEN_ITEM_ID = case((ChecklistItem.completed == True, null()), else_=ChecklistItem.id)
+
+
+def department_key(department_id: Optional[int]) -> int:
+    return NO_DEPARTMENT if department_id is None else department_id
+
+
+def progress_dict(total: int, completed: int, oldest_open_item_id: Optional[int], **extra) -> dict:
+    percent = round(100.0 * completed / total, 1) if total else 0.0
+    return {"total": total, "completed": completed, "percent": percent,
+            "oldest_open_item_id": oldest_open_item_id, **extra}
+
+
+# --- maintenance incrémentale
+def refresh_user_progress(db: Session, user_ids: Iterable[Optional[int]]) -> None:
+    """
+    Recalcule les compteurs des users donnés (GROUP BY limité à leurs items, index user_id)
+    puis les lignes de leurs départements, dans la transaction en cours. Écritures groupées
+    et propagations ; une écriture d'un seul item passe par shift_item_progress.
+    Un user supprimé ou sans item n'a plus de ligne.
+    """
+    ids = sorted({uid for uid in user_ids if uid is not None})
+    if not ids:
+        return
+    db.flush()
+    for i in range(0, len(ids), BATCH_SIZE):
+        _refresh_batch(db, ids[i:i + BATCH_SIZE])
+
+
+def _refresh_batch(db: Session, ids: List[int]) -> None:
+    counts = db.execute(
+        select(ChecklistItem.user_id, func.count(ChecklistItem.id), func.sum(_COMPLETED), func.min(_OPEN_ITEM_ID))
+        .where(ChecklistItem.user_id.in_(ids))
+        .group_by(ChecklistItem.user_id)
+    )
+    fresh = {user_id: (total, completed or 0, oldest) for user_id, total, completed, oldest in counts}
+    departments = dict(db.execute(select(User.id, User.department_id).where(User.id.in_(ids))).all())
+    row = UserChecklistProgress
+    previous = {
+        user_id: tuple(values)
+        for user_id, *values in db.execute(
+            select(row.user_id, row.department_id, row.total, row.completed, row.oldest_open_item_id)
+            .where(row.user_id.in_(ids))
+            .with_for_update()
+        )
+    }
+
+    upserts, gone, keys = [], [], set()  # keys : départements dont une ligne de user change
+    for user_id in ids:
+        total, completed, oldest = fresh.get(user_id, (0, 0, None))
+        old = previous.get(user_id)
+        if user_id not in departments or total == 0:
+            if old is not None:
+                gone.append(user_id)
+                keys.add(department_key(old[0]))
+            continue
+        new = (departments[user_id], total, completed, oldest)
+        if old == new:
+            continue
+        upserts.append({"user_id": user_id, "department_id": new[0], "total": total, "completed": completed,
+                        "oldest_open_item_id": oldest})
+        keys.add(department_key(new[0]))
+        if old is not None:
+            keys.add(department_key(old[0]))
+
+    if gone:
+        db.execute(delete(row).where(row.user_id.in_(gone)).execution_options(synchronize_session=False))
+    if upserts:
+        # INSERT ... ON CONFLICT : deux premières écritures concurrentes d'un même user ne se heurtent pas
+        stmt = upsert_insert(db, row.__table__)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={c: stmt.excluded[c] for c in ("department_id", "total", "completed", "oldest_open_item_id")},
+        ), upserts)
+    if keys:
+        _recount_departments(db, keys)
+
+
+def _recount_departments(db: Session, keys: set) -> None:
+    """Lignes des départements donnés recalculées depuis celles de leurs users (valeurs absolues)."""
+    row = UserChecklistProgress
+    key = func.coalesce(row.department_id, NO_DEPARTMENT)
+    condition = row.department_id.in_([k for k in keys if k != NO_DEPARTMENT])
+    if NO_DEPARTMENT in keys:
+        condition = or_(condition, row.department_id == None)
+    totals = {k: (0, 0, 0, None) for k in keys}
+    for k, users, total, completed, oldest in db.execute(
+        select(key, func.count(), func.sum(row.total), func.sum(row.completed), func.min(row.oldest_open_item_id))
+        .where(condition)
+        .group_by(key)
+    ):
+        totals[k] = (users, total, completed, oldest)
+
+    stmt = upsert_insert(db, DepartmentChecklistProgress.__table__)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["department_key"],
+        set_={c: stmt.excluded[c] for c in ("users", "total", "completed", "oldest_open_item_id")},
+    ), [
+        {"department_key": k, "users": users, "total": total, "completed": completed, "oldest_open_item_id": oldest}
+        for k, (users, total, completed, oldest) in sorted(totals.items())
+    ])
+
+
+def _department_oldest(key: int):
+    # MIN sur l'index (department_id, oldest_open_item_id) : ne dépend pas du nombre de users
+    dept = UserChecklistProgress.department_id
+    condition = dept == None if key == NO_DEPARTMENT else dept == key
+    return select(func.min(UserChecklistProgress.oldest_open_item_id)).where(condition).scalar_subquery()
+
+
+def _user_oldest(user_id: int):
+    return select(func.min(_OPEN_ITEM_ID)).where(ChecklistItem.user_id == user_id).scalar_subquery()
+
+
+def _shifted_oldest(current, item_id: int, open_after: bool, recompute):
+    # item ouvert : peut devenir le plus ancien ; item fermé/retiré : recalcul seulement si c'était lui
+    if open_after:
+        return case((or_(current == None, current > item_id), item_id), else_=current)
+    return case((current == item_id, recompute), else_=current)
+
+
+def shift_item_progress(db: Session, user_id: Optional[int], item_id: int, total: int = 0, completed: int = 0,
+                        open_after: bool = False) -> None:
+    """
+    Un item d'un user créé (total +1), supprimé (total -1), terminé ou rouvert (completed ±1) :
+    compteurs du user puis de son département décalés en relatif, sans relire ses items.
+    `open_after` : l'item est ouvert après l'écriture (ajuste le plus ancien item ouvert).
+    Un user encore sans ligne de compteurs est recompté (refresh_user_progress).
+    """
+    if user_id is None or not (total or completed):
+        return
+    row = UserChecklistProgress
+    oldest = _shifted_oldest(row.oldest_open_item_id, item_id, open_after, _user_oldest(user_id))
+    if total > 0:
+        # première écriture possible : INSERT ... ON CONFLICT, pas de course sur la clé primaire
+        stmt = upsert_insert(db, row).values(
+            user_id=user_id,
+            department_id=select(User.department_id).where(User.id == user_id).scalar_subquery(),
+            total=total, completed=completed, oldest_open_item_id=item_id if open_after else None,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[row.user_id],
+            set_={"total": row.total + total, "completed": row.completed + completed, "oldest_open_item_id": oldest},
+        )
+    else:
+        stmt = (
+            update(row)
+            .where(row.user_id == user_id)
+            .values(total=row.total + total, completed=row.completed + completed, oldest_open_item_id=oldest)
+            .execution_options(synchronize_session=False)
+        )
+    updated = db.execute(stmt.returning(row.department_id, row.total)).first()
+    if updated is None:
+        refresh_user_progress(db, [user_id])
+        return
+
+    department_id, new_total = updated
+    users = 0
+    if total > 0 and new_total == total:
+        users = 1  # ligne créée : le user entre dans le département
+    elif new_total <= 0:
+        db.execute(delete(row).where(row.user_id == user_id).execution_options(synchronize_session=False))
+        users = -1
+    _shift_department(db, department_key(department_id), item_id, open_after, users, total, completed)
+
+
+def _shift_department(db: Session, key: int, item_id: int, open_after: bool, users: int, total: int,
+                      completed: int) -> None:
+    table = DepartmentChecklistProgress
+    oldest = _shifted_oldest(table.oldest_open_item_id, item_id, open_after, _department_oldest(key))
+    stmt = upsert_insert(db, table).values(
+        department_key=key, users=users, total=total, completed=completed,
+        oldest_open_item_id=_department_oldest(key),
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.department_key],
+        set_={"users": table.users + users, "total": table.total + total,
+              "completed": table.completed + completed, "oldest_open_item_id": oldest},
+    ))
+
+
+# --- reconstruction complète
+def reconcile_progress(db: Session) -> int:
+    """Reconstruit tous les compteurs par GROUP BY ; retourne le nombre de users comptés."""
+    db.execute(delete(DepartmentChecklistProgress))
+    db.execute(delete(UserChecklistProgress))
+
+    per_user = (
+        select(ChecklistItem.user_id, User.department_id, func.count(ChecklistItem.id),
+               func.sum(_COMPLETED), func.min(_OPEN_ITEM_ID))
+        .join(User, User.id == ChecklistItem.user_id)
+        .group_by(ChecklistItem.user_id, User.department_id)
+    )
+    db.execute(insert(UserChecklistProgress).from_select(
+        ["user_id", "department_id", "total", "completed", "oldest_open_item_id"], per_user
+    ))
+
+    key = func.coalesce(UserChecklistProgress.department_id, NO_DEPARTMENT)
+    per_department = select(
+        key, func.count(), func.sum(UserChecklistProgress.total), func.sum(UserChecklistProgress.completed),
+        func.min(UserChecklistProgress.oldest_open_item_id),
+    ).group_by(key)
+    db.execute(insert(DepartmentChecklistProgress).from_select(
+        ["department_key", "users", "total", "completed", "oldest_open_item_id"], per_department
+    ))
+    db.flush()
+    return db.scalar(select(func.count()).select_from(UserChecklistProgress))
+
+
+def progress_needs_rebuild(db: Session) -> bool:
+    # compteurs jamais construits (table toute neuve) alors que des users ont des items
+    has_counters = db.query(UserChecklistProgress.user_id).first() is not None
+    has_items = db.query(ChecklistItem.id).filter(ChecklistItem.user_id != None).first() is not None
+    return has_items and not has_counters
+
+
+# --- lectures (aucune lecture d'items)
+def get_user_progress(db: Session, user: User) -> dict:
+    row = db.get(UserChecklistProgress, user.id)
+    if row is None:
+        return progress_dict(0, 0, None, user_id=user.id, department_id=user.department_id)
+    return progress_dict(row.total, row.completed, row.oldest_open_item_id,
+                         user_id=user.id, department_id=user.department_id)
+
+
+def list_department_progress(db: Session, department_id: Optional[int] = None, all_departments: bool = False) -> List[dict]:
+    """Une ligne par département (ou seulement `department_id`) : O(départements)."""
+    q = db.query(DepartmentChecklistProgress)
+    if not all_departments:
+        q = q.filter(DepartmentChecklistProgress.department_key == department_key(department_id))
+    return [
+        progress_dict(
+            row.total, row.completed, row.oldest_open_item_id, users=row.users,
+            department_id=None if row.department_key == NO_DEPARTMENT else row.department_key,
+        )
+        for row in q.order_by(DepartmentChecklistProgress.department_key)
+    ]
+
+
+def company_progress(db: Session) -> dict:
+    t = DepartmentChecklistProgress
+    users, total, completed, oldest = db.execute(
+        select(func.coalesce(func.sum(t.users), 0), func.coalesce(func.sum(t.total), 0),
+               func.coalesce(func.sum(t.completed), 0), func.min(t.oldest_open_item_id))
+    ).one()
+    return progress_dict(total, completed, oldest, users=users)
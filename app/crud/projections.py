@@ -0,0 +1,30 @@
+
+# Projections de lecture : seulement les colonnes d'un schéma de sortie, nommées
+# comme ses champs, pour sérialiser les lignes sans passer par les modèles Pydantic.
+from typing import Dict, List, Sequence
+
+
+def out_columns(model, schema, **expressions) -> list:
+    """Une colonne par champ de `schema` ; `expressions` remplace les champs calculés."""
+    return [
+        expressions[name].label(name) if name in expressions else getattr(model, name)
+        for name in schema.__fields__
+    ]
+
+
+def with_columns(query, columns: Sequence, keys: Sequence = ()):
+    """
+    Même requête (filtres, tri, limite), réduite à `columns`.
+    Les clés de pagination absentes sont ajoutées en fin de ligne pour calculer le curseur.
+    """
+    names = {c.key for c in columns}
+    selected = [*columns, *[k for k in keys if k.key not in names]]
+    if hasattr(query, "with_entities"):  # Query (sync)
+        return query.with_entities(*selected)
+    return query.with_only_columns(*selected)  # select() (async)
+
+
+def rows_to_dicts(rows, columns: Sequence) -> List[Dict]:
+    # zip s'arrête aux colonnes du schéma : les clés de pagination ajoutées sont ignorées
+    names = [c.key for c in columns]
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,23 @@
+
+import datetime
+from sqlalchemy.orm import Session
+from app.crud.upserts import upsert_insert
+from app.models.revoked_token import RevokedToken
+from typing import List
+
+def add_revoked_token(db: Session, jti: str, expires_at: datetime.datetime) -> bool:
+    # Retourne False si le jti était déjà révoqué. L'INSERT est le seul test : deux rotations
+    # concurrentes du même token, une seule insère la ligne, l'autre voit le conflit.
+    stmt = upsert_insert(db, RevokedToken).values(jti=jti, expires_at=expires_at)
+    return db.execute(stmt.on_conflict_do_nothing(index_elements=["jti"])).rowcount == 1
+
+def is_token_revoked(db: Session, jti: str) -> bool:
+    return db.query(RevokedToken.jti).filter(RevokedToken.jti == jti).first() is not None
+
+def list_active_revoked_jtis(db: Session) -> List[str]:
+    now = datetime.datetime.utcnow()
+    return [row[0] for row in db.query(RevokedToken.jti).filter(RevokedToken.expires_at > now)]
+
+def purge_expired_revoked_tokens(db: Session) -> int:
+    now = datetime.datetime.utcnow()
+    return db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
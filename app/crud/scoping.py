@@ -0,0 +1,75 @@
+
+# Périmètre de visibilité : traduit le rôle et le département de l'appelant en
+# prédicats SQL, pour que les listes soient filtrées, paginées et comptées en base.
+# `principal` est un User ou un Principal (claims JWT) : seuls id, role et
+# department_id sont lus. Fonctionne sur Query (sync) comme sur select() (async).
+from sqlalchemy import and_, false, or_, select, true
+from app.models.checklist import ChecklistItem
+from app.models.document import Document
+from app.models.user import User
+
+ADMIN_ROLES = ("SUPERADMIN", "RH")
+DEPARTMENT_ROLES = ("DEPT", "MANAGER")
+
+
+def role_of(principal) -> str:
+    return getattr(principal.role, "value", principal.role)
+
+
+def is_admin(principal) -> bool:
+    return role_of(principal) in ADMIN_ROLES
+
+
+def scope_users(query, principal):
+    """SUPERADMIN/RH : tous ; DEPT/MANAGER : leur département ; autres : eux-mêmes."""
+    role = role_of(principal)
+    if role in ADMIN_ROLES:
+        return query
+    if role in DEPARTMENT_ROLES:
+        return query.filter(User.department_id == principal.department_id)
+    return query.filter(User.id == principal.id)
+
+
+def scope_documents(query, principal):
+    """SUPERADMIN/RH : tous ; autres : documents globaux + ceux de leur département."""
+    if is_admin(principal):
+        return query
+    return query.filter(or_(Document.department_id == None, Document.department_id == principal.department_id))
+
+
+def scope_checklist_items(query, principal):
+    """
+    SUPERADMIN/RH : tous ; DEPT/MANAGER : items des users de leur département
+    + templates du département ; autres : leurs propres items.
+    """
+    role = role_of(principal)
+    if role in ADMIN_ROLES:
+        return query
+    if role in DEPARTMENT_ROLES:
+        dept_users = select(User.id).where(User.department_id == principal.department_id)
+        return query.filter(or_(
+            ChecklistItem.user_id.in_(dept_users),
+            and_(ChecklistItem.user_id == None, ChecklistItem.department_id == principal.department_id),
+        ))
+    return query.filter(ChecklistItem.user_id == principal.id)
+
+
+def checklist_item_permission(principal, action: str):
+    """
+    Droit d'agir sur un item (action : view | complete | update | delete), en prédicat SQL
+    utilisable dans un SELECT comme dans un UPDATE/DELETE conditionnel.
+    SUPERADMIN/RH : tout ; le propriétaire peut voir et compléter ses items ;
+    DEPT/MANAGER : items des users de leur département, et templates du département en update.
+    """
+    role = role_of(principal)
+    if role in ADMIN_ROLES:
+        return true()
+    rules = []
+    if action in ("view", "complete"):
+        rules.append(ChecklistItem.user_id == principal.id)
+    if role in DEPARTMENT_ROLES:
+        dept_users = select(User.id).where(User.department_id == principal.department_id)
+        rules.append(ChecklistItem.user_id.in_(dept_users))
+        if action == "update" and principal.department_id:
+            rules.append(ChecklistItem.department_id == principal.department_id)
+    return or_(*rules) if rules else false()
@@ -0,0 +1,14 @@
+# INSERT ... ON CONFLICT : le test d'existence et l'écriture en une seule instruction atomique.
+# SQLite et PostgreSQL (les deux profils de moteur) partagent la même syntaxe.
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def upsert_insert(db: Session, model):
+    """insert() du dialecte de la session, qui expose on_conflict_do_nothing / on_conflict_do_update."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in _INSERTS:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT non supporté pour {dialect}")
+    return _INSERTS[dialect](model)
@@ -2,10 +2,19 @@
 from app.models.user import User, RoleEnum
 from app.schemas.user import UserCreate
 
+from sqlalchemy import insert, or_
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.schemas.user import UserUpdate
+from app.schemas.user import UserOut, UserUpdate
 from app.core.security import hash_password
+from app.crud.pagination import apply_keyset
+from app.crud.progress_crud import refresh_user_progress
+from app.crud.projections import out_columns, with_columns
+from app.crud.loaders import loader_for
+from app.crud.scoping import scope_users
+from app.db.unit_of_work import after_commit
+from app.services.principal_cache import principal_cache
+from app.services.token_versions import token_versions
 
 def create_user(db: Session, user_in: UserCreate) -> User:
     user = User(
@@ -17,8 +26,7 @@ def create_user(db: Session, user_in: UserCreate) -> User:
         department_id=user_in.department_id,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
 def create_superadmin(db: Session, email: str, password: str, username: str = "SuperAdmin"):
@@ -35,22 +43,77 @@ def create_superadmin(db: Session, email: str, password: str, username: str = "S
         department_id=None
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
+def find_taken_logins(db: Session, emails, usernames):
+    """Emails et usernames déjà utilisés parmi ceux fournis, en une requête."""
+    rows = db.query(User.email, User.username).filter(
+        or_(User.email.in_(list(emails)), User.username.in_(list(usernames)))
+    ).all()
+    return {r.email for r in rows}, {r.username for r in rows}
+
+def bulk_create_users(db: Session, rows) -> dict:
+    """INSERT groupé (executemany) ; retourne {email: id}."""
+    if not rows:
+        return {}
+    db.execute(insert(User), list(rows))
+    emails = [r["email"] for r in rows]
+    return dict(db.query(User.email, User.id).filter(User.email.in_(emails)).all())
+
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
+def get_user_by_login(db: Session, identifier: str):
+    # une seule requête sur les deux index uniques ; l'email est prioritaire
+    users = db.query(User).filter(or_(User.email == identifier, User.username == identifier)).limit(2).all()
+    for user in users:
+        if user.email == identifier:
+            return user
+    return users[0] if users else None
+
 def get_user_by_id(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+    # identity map de la requête d'abord, sinon groupé avec les autres ids en attente
+    return loader_for(db, User).load(user_id)
+
+USER_PAGE_KEYS = (User.id,)
+USER_OUT_COLUMNS = out_columns(User, UserOut)
+
+def users_query(db: Session, principal=None):
+    q = db.query(User)
+    return scope_users(q, principal) if principal is not None else q
+
+def list_users(db: Session, skip: int = 0, limit: int = 100, cursor: str = None, principal=None, columns=None):
+    q = apply_keyset(users_query(db, principal), USER_PAGE_KEYS, cursor, limit).offset(skip)
+    return (with_columns(q, columns, USER_PAGE_KEYS) if columns else q).all()
+
+def count_users(db: Session, principal=None) -> int:
+    return users_query(db, principal).count()
+
 
-def list_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
 
+def revoke_user_tokens(user: User) -> None:
+    # les JWT émis avec l'ancienne version deviennent invalides
+    user.token_version = (user.token_version or 0) + 1
+
+
+def _publish_token_version(user_id: int, version: int) -> None:
+    token_versions.set(user_id, version)
+    principal_cache.invalidate_user(user_id)
+
+
+def user_tokens_revoked(db: Session, user: User) -> None:
+    # propage la nouvelle version aux caches du process, une fois la transaction validée
+    after_commit(db, _publish_token_version, user.id, user.token_version)
+
+
+def _forget_user(user_id: int) -> None:
+    token_versions.forget(user_id)
+    principal_cache.invalidate_user(user_id)
 
 
 def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
+    old_claims = (user.role, user.department_id, user.hashed_password)
     if user_in.username:
         user.username = user_in.username
     if user_in.full_name:
@@ -72,10 +135,20 @@ def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
         else:
             user.department_id = None
 
-    db.commit()
-    db.refresh(user)
+    # rôle, département ou mot de passe modifié → les tokens existants sont révoqués
+    if (user.role, user.department_id, user.hashed_password) != old_claims:
+        revoke_user_tokens(user)
+
+    db.flush()
+    user_tokens_revoked(db, user)
+    if user.department_id != old_claims[1]:
+        # ses compteurs changent de département
+        refresh_user_progress(db, [user.id])
     return user
 
 def delete_user(db: Session, user: User):
+    user_id = user.id
     db.delete(user)
-    db.commit()
+    db.flush()
+    refresh_user_progress(db, [user_id])
+    after_commit(db, _forget_user, user_id)
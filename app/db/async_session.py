@@ -0,0 +1,57 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.session import DATABASE_URL, resolve_engine_profile, set_sqlite_pragmas
+
+
+def to_async_url(url: str) -> str:
+    """sqlite:// -> sqlite+aiosqlite://, postgresql:// -> postgresql+asyncpg://"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgresql+psycopg2:"):
+        return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+    return url
+
+
+def build_async_engine(url: str = DATABASE_URL, profile: str = settings.DB_ENGINE_PROFILE):
+    profile = resolve_engine_profile(url, profile)
+    async_url = to_async_url(url)
+
+    if profile == "sqlite":
+        engine = create_async_engine(async_url, connect_args={
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        })
+        # aiosqlite expose la connexion DB-API sous-jacente : mêmes PRAGMA que le moteur sync
+        event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+        return engine
+
+    if profile == "postgres":
+        return create_async_engine(
+            async_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            connect_args={"server_settings": {"statement_timeout": str(int(settings.DB_STATEMENT_TIMEOUT_MS))}},
+        )
+
+    return create_async_engine(async_url)
+
+
+async_engine = build_async_engine()
+AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    # même unit of work que get_db
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
@@ -0,0 +1,25 @@
+"""
+Migration ponctuelle vers ONBOARDING_MODE="plan" : les items copiés des templates
+deviennent des étapes du plan (état terminé conservé) et sont supprimés de checklist_items.
+Lancée au démarrage en mode "plan" s'il reste des copies, ou à la main :
+
+    python -m app.db.migrate_to_plan_mode
+"""
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.services.onboarding_plans import migrate_copied_items_to_plans
+
+
+def main() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        deleted = migrate_copied_items_to_plans(db)
+        db.commit()
+        print(f"Copied checklist items migrated to onboarding plans: {deleted}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
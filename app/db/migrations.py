@@ -0,0 +1,39 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from app.models.base import Base
+
+# Colonnes ajoutées après la création initiale des tables.
+# create_all() ne modifie pas une table existante : on les ajoute ici.
+ADDED_COLUMNS = {
+    "users": {
+        "token_version": "INTEGER NOT NULL DEFAULT 0",
+        "onboarding_plan_id": "INTEGER REFERENCES onboarding_plans(id)",
+    },
+}
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Met à niveau une base existante (idempotent)."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            if not inspector.has_table(table):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+    create_missing_indexes(engine)
+
+
+def create_missing_indexes(engine: Engine) -> None:
+    """Crée les index déclarés sur les modèles qui n'existent pas encore en base."""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
@@ -0,0 +1,24 @@
+"""
+Reconstruit les compteurs d'avancement des checklists à partir des items (GROUP BY).
+À lancer après un import SQL direct, une restauration, ou si un écart est constaté :
+
+    python -m app.db.reconcile_progress
+"""
+from app.crud.progress_crud import reconcile_progress
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+
+
+def main() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        users = reconcile_progress(db)
+        db.commit()
+        print(f"Progress counters rebuilt for {users} users")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
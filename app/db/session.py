@@ -1,16 +1,72 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db import unit_of_work  # noqa: F401  (enregistre les hooks after_commit / after_rollback)
 
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+def resolve_engine_profile(url: str, profile: str = "auto") -> str:
+    """'auto' choisit le profil d'après le dialecte de l'URL."""
+    if profile != "auto":
+        return profile
+    if url.startswith("sqlite"):
+        return "sqlite"
+    if url.startswith("postgresql"):
+        return "postgres"
+    return "default"
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Listener "connect" : réglages appliqués à chaque nouvelle connexion SQLite."""
+    cursor = dbapi_connection.cursor()
+    # WAL : les lecteurs ne sont plus bloqués par l'écrivain
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+
+def build_engine(url: str = DATABASE_URL, profile: str = settings.DB_ENGINE_PROFILE) -> Engine:
+    profile = resolve_engine_profile(url, profile)
+
+    if profile == "sqlite":
+        engine = create_engine(url, connect_args={
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        })
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        return engine
+
+    if profile == "postgres":
+        return create_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            connect_args={"options": f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"},
+        )
+
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(url, connect_args=connect_args)
+
+
+engine = build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
+    """Session de la requête : un seul COMMIT à la fin, ROLLBACK si une exception remonte."""
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
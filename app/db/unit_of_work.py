@@ -0,0 +1,43 @@
+
+# Unit of work par requête : les fonctions CRUD font `flush()` (SQL envoyé, ids
+# disponibles) mais ne valident pas ; `get_db` fait un seul COMMIT en fin de
+# requête, ou un ROLLBACK si une exception remonte. Les effets de bord hors base
+# (caches du process, fichiers) sont différés avec after_commit / after_rollback.
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_AFTER_COMMIT = "after_commit_callbacks"
+_AFTER_ROLLBACK = "after_rollback_callbacks"
+
+
+def after_commit(db: Session, fn: Callable[..., Any], *args: Any) -> None:
+    """Exécute fn(*args) une fois la transaction validée (jamais si elle est annulée)."""
+    db.info.setdefault(_AFTER_COMMIT, []).append((fn, args))
+
+
+def after_rollback(db: Session, fn: Callable[..., Any], *args: Any) -> None:
+    """Exécute fn(*args) si la transaction est annulée (nettoyage de fichiers, ...)."""
+    db.info.setdefault(_AFTER_ROLLBACK, []).append((fn, args))
+
+
+def _run(callbacks) -> None:
+    # la session n'a plus de transaction active ici : les callbacks ne doivent pas émettre de SQL
+    for fn, args in callbacks:
+        fn(*args)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session: Session) -> None:
+    session.info.pop(_AFTER_ROLLBACK, None)
+    _run(session.info.pop(_AFTER_COMMIT, []))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _on_rollback(session: Session, previous_transaction) -> None:
+    # uniquement pour la transaction racine (pas les savepoints)
+    if previous_transaction.parent is not None:
+        return
+    session.info.pop(_AFTER_COMMIT, None)
+    _run(session.info.pop(_AFTER_ROLLBACK, []))
@@ -1,12 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from app.db.session import engine, SessionLocal
+from app.db.migrations import upgrade_schema
 from app.models.base import Base
-from app.api import auth, users, departments, documents, checklists
+from app.api import auth, users, departments, documents, checklists, metrics, progress
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.hashing import HasherBusyError
+from app.crud.pagination import InvalidCursor
+from app.crud.onboarding_plan_crud import has_copied_template_items
+from app.crud.progress_crud import progress_needs_rebuild, reconcile_progress
 from app.crud.user_crud import create_superadmin, get_user_by_email
+from app.services.onboarding_plans import migrate_copied_items_to_plans
+from app.services.token_revocation import revoked_tokens
 
 # create tables
 Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 
 
 
@@ -17,10 +27,40 @@ def include_routers_with_prefix(app: FastAPI, routers: list, prefix: str = "/api
 
 
 app = FastAPI(title="HelloFmap - Onboarding Platform (MVP)")
-routers = [auth.router, users.router, departments.router, documents.router, checklists.router]
+routers = [auth.router, users.router, departments.router, documents.router, checklists.router, metrics.router,
+           progress.router]
+
+if settings.DB_ASYNC:
+    # import tardif : aiosqlite/asyncpg ne sont requis que pour la pile async
+    from app.api import async_routes
+    # enregistrées en premier, elles priment sur les routes sync de même chemin
+    routers.insert(0, async_routes.router)
 
 include_routers_with_prefix(app, routers)
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        encodings=settings.compression_encodings,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    )
+
+
+@app.exception_handler(HasherBusyError)
+def hasher_busy_handler(request: Request, exc: HasherBusyError):
+    # File bcrypt saturée : on répond vite plutôt que d'empiler les requêtes
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": "Invalid pagination cursor"})
+
 @app.on_event("startup")
 def startup_event():
     # Bootstrap superadmin if env vars set and not exist
@@ -30,12 +70,40 @@ def startup_event():
             existing = get_user_by_email(db, settings.ADMIN_EMAIL)
             if not existing:
                 create_superadmin(db, email=settings.ADMIN_EMAIL, password=settings.ADMIN_PASSWORD, username=settings.ADMIN_USERNAME)
+                db.commit()
                 print("SuperAdmin created:", settings.ADMIN_EMAIL)
             else:
                 print("SuperAdmin exists:", settings.ADMIN_EMAIL)
         finally:
             db.close()
 
+    # Recharge les refresh tokens révoqués encore valides dans le filtre de Bloom
+    db = SessionLocal()
+    try:
+        revoked_tokens.load(db)
+        db.commit()
+    finally:
+        db.close()
+
+    # Compteurs d'avancement : construits une fois sur une base qui n'en avait pas encore
+    db = SessionLocal()
+    try:
+        if progress_needs_rebuild(db):
+            print("Progress counters rebuilt for", reconcile_progress(db), "users")
+            db.commit()
+    finally:
+        db.close()
+
+    # Passage au mode "plan" : les items copiés en mode "copy" doublonneraient les étapes du plan
+    if settings.ONBOARDING_MODE == "plan":
+        db = SessionLocal()
+        try:
+            if has_copied_template_items(db):
+                print("Copied checklist items migrated to onboarding plans:", migrate_copied_items_to_plans(db))
+                db.commit()
+        finally:
+            db.close()
+
 @app.get("/")
 def root():
     return {"message": "HelloFmap API is running"}
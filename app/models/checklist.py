@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 from app.models.base import Base
 
 class ChecklistItem(Base):
@@ -6,5 +6,15 @@ class ChecklistItem(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     completed = Column(Boolean, default=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
+
+    __table_args__ = (
+        # templates (user_id IS NULL) par département : index partiel
+        Index(
+            "ix_checklist_items_template_department",
+            "department_id",
+            sqlite_where=user_id.is_(None),
+            postgresql_where=user_id.is_(None),
+        ),
+    )
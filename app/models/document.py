@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from app.models.base import Base
 import datetime
 
@@ -13,3 +13,9 @@ class Document(Base):
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)  # None => global RH doc
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     uploaded_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        # pagination keyset (uploaded_at, id), globale ou filtrée par département
+        Index("ix_documents_uploaded_at_id", "uploaded_at", "id"),
+        Index("ix_documents_department_uploaded_at_id", "department_id", "uploaded_at", "id"),
+    )
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, Index
+from app.models.base import Base
+import datetime
+
+class OnboardingPlan(Base):
+    """Version figée des templates (globaux + départementaux) d'un département."""
+    __tablename__ = "onboarding_plans"
+    id = Column(Integer, primary_key=True, index=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)  # None => users sans département
+    version = Column(Integer, nullable=False)
+    content_hash = Column(String, nullable=False)  # évite de republier un contenu identique
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("department_id", "version", name="uq_onboarding_plans_department_version"),
+    )
+
+class OnboardingPlanStep(Base):
+    __tablename__ = "onboarding_plan_steps"
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("onboarding_plans.id"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)  # département du template d'origine
+    position = Column(Integer, nullable=False, default=0)
+
+class UserStepProgress(Base):
+    """État par user, creux : une ligne seulement pour les étapes terminées."""
+    __tablename__ = "user_step_progress"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    step_id = Column(Integer, ForeignKey("onboarding_plan_steps.id"), primary_key=True)
+    completed_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_user_step_progress_step_id", "step_id"),
+    )
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Index
+from app.models.base import Base
+
+
+class UserChecklistProgress(Base):
+    """Compteurs de checklist d'un user, tenus à jour dans la transaction qui modifie ses items."""
+    __tablename__ = "user_checklist_progress"
+    user_id = Column(Integer, primary_key=True)
+    department_id = Column(Integer, nullable=True)  # département du user au dernier calcul
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    oldest_open_item_id = Column(Integer, nullable=True)  # ids croissants : plus petit id = plus ancien
+
+    __table_args__ = (
+        # MIN(oldest_open_item_id) par département sans parcourir ses users
+        Index("ix_user_checklist_progress_department_oldest", "department_id", "oldest_open_item_id"),
+    )
+
+
+class DepartmentChecklistProgress(Base):
+    """Somme des compteurs des users d'un département : vue d'ensemble en O(départements)."""
+    __tablename__ = "department_checklist_progress"
+    department_key = Column(Integer, primary_key=True)  # department_id, 0 = users sans département
+    users = Column(Integer, nullable=False, default=0)  # users ayant au moins un item
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    oldest_open_item_id = Column(Integer, nullable=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.models.base import Base
+import datetime
+
+
+class PropagationJob(Base):
+    """
+    Propagation d'un changement de template à tous les users concernés.
+    En base : l'état est lisible depuis n'importe quel worker.
+    """
+    __tablename__ = "propagation_jobs"
+    id = Column(String, primary_key=True)
+    action = Column(String, nullable=False)  # create | update | delete
+    title = Column(String, nullable=False)
+    department_id = Column(Integer, nullable=True)
+    old_title = Column(String, nullable=True)
+    old_department_id = Column(Integer, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending | running | done | failed
+    total_users = Column(Integer, nullable=False, default=0)
+    processed_users = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    deleted = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,7 @@
+from sqlalchemy import Column, String, DateTime
+from app.models.base import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    jti = Column(String, primary_key=True)  # id unique du refresh token
+    expires_at = Column(DateTime, nullable=False, index=True)  # purge possible après expiration
@@ -17,5 +17,9 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(RoleEnum), nullable=False)
-    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True, index=True)
+    # incrémenté à chaque changement de rôle/département/mot de passe : révoque les JWT émis
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # version du plan d'onboarding suivie par le user (mode ONBOARDING_MODE="plan")
+    onboarding_plan_id = Column(Integer, ForeignKey("onboarding_plans.id"), nullable=True)
 
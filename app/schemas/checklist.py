@@ -1,6 +1,7 @@
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, conlist
+from typing import List, Optional
+from datetime import datetime
 
 class ChecklistCreate(BaseModel):
     title: str
@@ -19,6 +20,48 @@ class ChecklistOut(BaseModel):
     completed: bool
     user_id: Optional[int]
     department_id: Optional[int]
+    # "item" : ligne de checklist_items ; "plan" : étape du plan d'onboarding (id = id de l'étape)
+    source: str = "item"
 
     class Config:
         orm_mode = True
+
+
+class PropagationJobOut(BaseModel):
+    id: str
+    action: str
+    title: str
+    department_id: Optional[int]
+    status: str
+    total_users: int
+    processed_users: int
+    inserted: int
+    updated: int
+    deleted: int
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+
+# --- opérations groupées : un aller-retour, une transaction, un résultat par id
+class ChecklistBatchIds(BaseModel):
+    ids: conlist(int, min_items=1, max_items=1000)
+
+
+class ChecklistBatchUpdate(ChecklistBatchIds):
+    changes: ChecklistUpdate
+
+
+class ChecklistBatchItemResult(BaseModel):
+    id: int
+    status: str  # completed | updated | deleted | not_found | forbidden
+    detail: Optional[str] = None
+
+
+class ChecklistBatchReport(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[ChecklistBatchItemResult]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ProgressOut(BaseModel):
+    total: int
+    completed: int
+    percent: float
+    oldest_open_item_id: Optional[int]  # item non terminé le plus ancien
+
+
+class UserProgressOut(ProgressOut):
+    user_id: int
+    department_id: Optional[int]
+
+
+class DepartmentProgressOut(ProgressOut):
+    department_id: Optional[int]  # None : users sans département
+    users: int
+
+
+class CompanyProgressOut(ProgressOut):
+    users: int
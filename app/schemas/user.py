@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, constr
-from typing import Optional
+from typing import List, Optional
 from app.models.user import RoleEnum
 
 class UserCreate(BaseModel):
@@ -32,18 +32,47 @@ class UserUpdate(BaseModel):
     department_id: Optional[int] = None
 
 
+class UserImportRowResult(BaseModel):
+    row: int
+    status: str  # created | error
+    user_id: Optional[int] = None
+    email: Optional[str] = None
+    errors: Optional[List[str]] = None
+
+
+class UserImportReport(BaseModel):
+    created: int
+    failed: int
+    rows: List[UserImportRowResult]
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
     role: Optional[str] = None
+    dept: Optional[int] = None
+    ver: Optional[int] = None
     exp: Optional[int] = None
 
 
+class Principal(BaseModel):
+    """Identité authentifiée construite à partir des claims signés (sans requête User)."""
+    id: int
+    role: RoleEnum
+    department_id: Optional[int] = None
+    token_version: int = 0
+
+
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
 
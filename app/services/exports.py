@@ -0,0 +1,73 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterator, List, Sequence
+
+from sqlalchemy import select
+
+from app.crud.checklist_crud import CHECKLIST_OUT_COLUMNS
+from app.crud.document_crud import DOCUMENT_OUT_COLUMNS
+from app.crud.scoping import scope_checklist_items, scope_documents, scope_users
+from app.crud.user_crud import USER_OUT_COLUMNS
+from app.db.session import SessionLocal
+from app.models.checklist import ChecklistItem
+from app.models.document import Document
+from app.models.user import User
+
+# lignes lues (curseur serveur) et encodées par lot : la mémoire ne dépend pas du volume exporté
+EXPORT_BATCH_SIZE = 1000
+
+
+# Requêtes d'export : colonnes des schémas de sortie, périmètre de l'appelant, ordre stable.
+# Les valeurs du principal sont figées dans le statement à sa construction.
+def users_export(principal):
+    return scope_users(select(*USER_OUT_COLUMNS), principal).order_by(User.id)
+
+
+def checklist_items_export(principal):
+    return scope_checklist_items(select(*CHECKLIST_OUT_COLUMNS), principal).order_by(ChecklistItem.id)
+
+
+def documents_export(principal):
+    columns = [*DOCUMENT_OUT_COLUMNS, Document.uploaded_at]
+    return scope_documents(select(*columns), principal).order_by(Document.id)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_chunk(names: List[str], rows: Sequence) -> bytes:
+    lines = (json.dumps(dict(zip(names, map(_plain, row))), ensure_ascii=False) for row in rows)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv_chunk(rows: Sequence) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_plain(v) for v in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def stream_export(statement, fmt: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Produit l'export lot par lot (NDJSON : un objet par ligne ; CSV : en-tête puis lignes).
+    Le corps d'une StreamingResponse est lu après la fermeture de la session de la requête :
+    le générateur ouvre la sienne, fermée en fin d'export comme à la déconnexion du client.
+    """
+    names = [c.key for c in statement.selected_columns]
+    if fmt == "csv":
+        yield _csv_chunk([names])
+
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(names, rows)
+    finally:
+        db.close()
@@ -1,6 +1,8 @@
 import os
 import uuid
+from typing import List, Optional, Tuple
 from fastapi import UploadFile
+from app.core.compression import COMPRESSORS, is_compressible, negotiate, new_compressor
 from app.core.config import settings
 
 STORAGE_DIR =  settings.STORAGE_DIR
@@ -21,3 +23,43 @@ def save_upload_file(upload_file: UploadFile, subfolder: str = "") -> (str, str)
         for chunk in upload_file.file:
             buffer.write(chunk)
     return stored_name, path
+
+
+# Fichiers pré-compressés ("<fichier>.gz", ".br", ".zst") : servis tels quels au téléchargement
+SIDECAR_SUFFIXES = {"br": ".br", "zstd": ".zst", "gzip": ".gz"}
+
+
+def sidecar_paths(path: str) -> List[str]:
+    return [path + suffix for suffix in SIDECAR_SUFFIXES.values()]
+
+
+def write_precompressed(path: str, content_type: Optional[str]) -> List[str]:
+    """
+    Écrit une version compressée du fichier par encodage disponible (documents textuels
+    d'au moins COMPRESSION_MIN_SIZE octets). Retourne les chemins écrits.
+    """
+    if not is_compressible(content_type) or os.path.getsize(path) < settings.COMPRESSION_MIN_SIZE:
+        return []
+    written = []
+    for encoding in settings.compression_encodings:
+        if encoding not in COMPRESSORS:
+            continue
+        _, _, level = COMPRESSORS[encoding]
+        compressor = new_compressor(encoding, level)
+        target = path + SIDECAR_SUFFIXES[encoding]
+        # fichier temporaire puis rename : un téléchargement ne voit jamais un sidecar partiel
+        with open(path, "rb") as source, open(target + ".tmp", "wb") as out:
+            for chunk in iter(lambda: source.read(64 * 1024), b""):
+                out.write(compressor.compress(chunk, flush=False))
+            out.write(compressor.finish())
+        os.replace(target + ".tmp", target)
+        written.append(target)
+    return written
+
+
+def precompressed_variant(path: str, accept_encoding: str) -> Optional[Tuple[str, str]]:
+    """(chemin du sidecar, encodage) préféré parmi ceux présents et acceptés par le client."""
+    present = [e for e in settings.compression_encodings
+               if e in SIDECAR_SUFFIXES and os.path.exists(path + SIDECAR_SUFFIXES[e])]
+    encoding = negotiate(accept_encoding, present)
+    return (path + SIDECAR_SUFFIXES[encoding], encoding) if encoding else None
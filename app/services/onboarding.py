@@ -1,10 +1,18 @@
+from collections import defaultdict
+
 from app.crud.checklist_crud import (
-    create_checklist_item,
-    list_department_template,
+    list_template_titles,
     list_checklist_items_for_user,
-    delete_checklist_item
+    bulk_create_checklist_items,
+    bulk_delete_checklist_items,
+    bulk_set_items_department,
 )
+from app.core.config import settings
 from app.crud.document_crud import list_documents
+from app.models.checklist import ChecklistItem
+from app.crud.onboarding_plan_crud import publish_plan, set_users_plan
+from app.services.onboarding_plans import assign_plan_for_user
+from app.services.read_cache import invalidate_user_checklists
 
 def assign_onboarding_for_user(db, user):
     """
@@ -13,42 +21,76 @@ def assign_onboarding_for_user(db, user):
     - Ne crée pas de doublons
     - Met à jour le department_id des items existants si nécessaire
     - Ajoute seulement les items manquants selon le département actuel
+    Le diff est calculé une fois puis appliqué en DELETE/UPDATE/INSERT groupés,
+    dans la transaction de l'appelant.
+    En mode "plan", le user est seulement rattaché à la version courante du plan.
     """
-    # Templates globaux + départementaux
-    global_templates = list_department_template(db, department_id=None)
-    dept_templates = list_department_template(db, department_id=user.department_id) if user.department_id else []
+    if settings.ONBOARDING_MODE == "plan":
+        return assign_plan_for_user(db, user), list_documents(db, department_id=user.department_id)
 
-    templates = global_templates + dept_templates
-    template_titles = {t.title: t for t in templates}
+    # Templates globaux + départementaux : {title: department_id}
+    templates = list_template_titles(db, user.department_id)
 
-    # Récupère les items existants pour l'utilisateur
-    existing_items = list_checklist_items_for_user(db, user.id)
-    created_or_updated = []
+    # Items existants de l'utilisateur (colonnes seulement, pas d'objets ORM)
+    existing = (
+        db.query(ChecklistItem.id, ChecklistItem.title, ChecklistItem.department_id)
+        .filter(ChecklistItem.user_id == user.id)
+        .all()
+    )
 
-    for item in existing_items:
+    to_delete = []
+    to_update = defaultdict(list)  # department_id cible -> ids
+    kept_titles = set()
+    for item_id, title, dept_id in existing:
         # Supprimer les items liés à un ancien département qui ne sont plus dans les templates
-        if item.department_id is not None and item.title not in template_titles:
-            delete_checklist_item(db, item.id)
-        else:
-            # Mise à jour du department_id si nécessaire
-            if item.title in template_titles and item.department_id != template_titles[item.title].department_id:
-                item.department_id = template_titles[item.title].department_id
-                db.commit()
-                db.refresh(item)
-            created_or_updated.append(item)
+        if dept_id is not None and title not in templates:
+            to_delete.append(item_id)
+            continue
+        # Mise à jour du department_id si nécessaire
+        if title in templates and dept_id != templates[title]:
+            to_update[templates[title]].append(item_id)
+        kept_titles.add(title)
 
     # Ajouter les items manquants
-    existing_titles = {item.title for item in created_or_updated}
-    for t in templates:
-        if t.title not in existing_titles:
-            new_item = create_checklist_item(db, type('X', (), {
-                'title': t.title,
-                'department_id': t.department_id,
-                'user_id': user.id
-            })())
-            created_or_updated.append(new_item)
+    to_insert = [
+        {"title": title, "department_id": dept_id, "user_id": user.id, "completed": False}
+        for title, dept_id in templates.items()
+        if title not in kept_titles
+    ]
+
+    bulk_delete_checklist_items(db, to_delete)
+    for dept_id, ids in to_update.items():
+        bulk_set_items_department(db, ids, dept_id)
+    bulk_create_checklist_items(db, to_insert)
+    invalidate_user_checklists(db, [user.id])
+
+    # Une seule lecture pour renvoyer l'état final
+    items = list_checklist_items_for_user(db, user.id)
 
     # Récupère documents du département actuel
     docs = list_documents(db, department_id=user.department_id)
 
-    return created_or_updated, docs
+    return items, docs
+
+
+def assign_onboarding_for_new_users(db, users):
+    """
+    Onboarding ensembliste de users tout juste créés (aucun item existant),
+    `users` = [(user_id, department_id)]. Une lecture de templates par département,
+    puis un INSERT groupé.
+    """
+    by_department = defaultdict(list)
+    for user_id, department_id in users:
+        by_department[department_id].append(user_id)
+
+    for department_id, user_ids in by_department.items():
+        if settings.ONBOARDING_MODE == "plan":
+            plan = publish_plan(db, department_id)
+            set_users_plan(db, user_ids, plan.id)
+            continue
+        templates = list_template_titles(db, department_id)
+        bulk_create_checklist_items(db, [
+            {"title": title, "department_id": dept_id, "user_id": user_id, "completed": False}
+            for user_id in user_ids
+            for title, dept_id in templates.items()
+        ])
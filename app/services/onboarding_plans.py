@@ -0,0 +1,75 @@
+from typing import Iterable, List, Optional
+
+from app.crud.checklist_crud import bulk_delete_checklist_items
+from app.crud.onboarding_plan_crud import (
+    copied_items_query,
+    import_completed_copies,
+    list_plan_view,
+    pin_users_to_plan,
+    publish_plan,
+)
+from app.models.department import Department
+from app.models.user import User
+from app.services.read_cache import invalidate_user_checklists
+
+
+def plan_rows_to_items(rows, user_id: int) -> List[dict]:
+    """Étapes du plan au format ChecklistOut (source="plan", id = id de l'étape)."""
+    return [
+        {
+            "id": step_id,
+            "title": title,
+            "completed": completed_at is not None,
+            "user_id": user_id,
+            "department_id": department_id,
+            "source": "plan",
+        }
+        for step_id, title, department_id, completed_at in rows
+    ]
+
+
+def plan_items_for_user(db, user_id: int) -> List[dict]:
+    # une seule requête : étapes du plan courant LEFT JOIN état du user
+    return plan_rows_to_items(list_plan_view(db, user_id), user_id)
+
+
+def assign_plan_for_user(db, user) -> List[dict]:
+    """Rattache le user à la version courante du plan de son département (aucune copie de template)."""
+    plan = publish_plan(db, user.department_id)
+    if user.onboarding_plan_id != plan.id:
+        pin_users_to_plan(db, plan, user_id=user.id)
+        db.refresh(user)
+    return plan_items_for_user(db, user.id)
+
+
+def refresh_department_plans(db, department_ids: Iterable[Optional[int]]) -> int:
+    """
+    Publie une nouvelle version pour les départements touchés par un changement de template
+    et y bascule leurs users. Un template global touche tous les départements.
+    Retourne le nombre de plans republiés.
+    """
+    targets = set(department_ids)
+    if None in targets:
+        targets |= {row[0] for row in db.query(Department.id)}
+    refreshed = 0
+    for department_id in targets:
+        plan = publish_plan(db, department_id)
+        pin_users_to_plan(db, plan)
+        refreshed += 1
+    return refreshed
+
+
+def migrate_copied_items_to_plans(db) -> int:
+    """
+    Passage de ONBOARDING_MODE="copy" à "plan" : rattache chaque user au plan courant
+    de son département, reporte ses items copiés terminés en UserStepProgress puis supprime
+    les copies (elles s'afficheraient en double à côté des étapes du plan).
+    Les items propres à un user (aucune étape de même titre) sont conservés.
+    Retourne le nombre d'items supprimés.
+    """
+    refresh_department_plans(db, {row[0] for row in db.query(User.department_id).distinct()})
+    import_completed_copies(db)
+    copies = db.execute(copied_items_query()).all()
+    bulk_delete_checklist_items(db, [item_id for item_id, _, _ in copies])
+    invalidate_user_checklists(db, {user_id for _, user_id, _ in copies})
+    return len(copies)
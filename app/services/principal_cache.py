@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+# Colonnes recopiées dans le snapshot (jamais le hash du mot de passe)
+SNAPSHOT_COLUMNS = [c.name for c in User.__table__.columns if c.name != "hashed_password"]
+
+
+class PrincipalCache:
+    """
+    Cache token -> (claims décodés, snapshot détaché du user).
+    Chaque user a un compteur de génération : invalidate_user() l'incrémente,
+    ce qui rend obsolètes toutes les entrées de ce user sans parcourir le cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, token: str) -> Optional[Tuple[Dict[str, Any], User]]:
+        entry = self._cache.get(token)
+        if entry is None:
+            return None
+        payload, snapshot, generation = entry
+        if generation != self.generation(snapshot["id"]):
+            self._cache.pop(token)
+            return None
+        # nouvelle instance transitoire à chaque hit : aucune fuite d'état entre requêtes
+        return payload, User(**snapshot)
+
+    def set(self, token: str, payload: Dict[str, Any], user: User, generation: int) -> None:
+        if generation != self.generation(user.id):
+            # le user a été modifié pendant le chargement : on ne met pas en cache
+            return
+        ttl = self._cache.ttl
+        exp = payload.get("exp")
+        if exp is not None:
+            ttl = min(ttl, float(exp) - time.time())
+        snapshot = {name: getattr(user, name) for name in SNAPSHOT_COLUMNS}
+        self._cache.set(token, (payload, snapshot, generation), ttl=ttl)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
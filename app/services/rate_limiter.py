@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from app.core.config import settings
+
+
+class InMemoryBucketBackend:
+    """Token buckets dans le process (un worker). Nombre de clés borné (LRU)."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            allowed = tokens >= cost
+            retry_after = 0.0 if allowed else (cost - tokens) / refill_per_second
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class RedisBucketBackend:
+    """Token buckets partagés entre workers (serveur Redis ou compatible)."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local cost = tonumber(ARGV[4])
+    local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local allowed = 0
+    local wait = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    else
+        wait = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(wait)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis  # dépendance optionnelle, seulement pour ce backend
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def consume(self, key: str, capacity: float, refill_per_second: float, cost: float = 1) -> Tuple[bool, float]:
+        allowed, wait = self._script(keys=[self.prefix + key], args=[capacity, refill_per_second, time.time(), cost])
+        return bool(allowed), float(wait)
+
+
+class LoginRateLimiter:
+    """
+    Limite les tentatives par IP et par identifiant (email/username),
+    avant tout calcul bcrypt. Retourne le délai d'attente conseillé (0 si autorisé).
+    """
+
+    def __init__(self, backend, ip_per_minute: int, identifier_per_minute: int):
+        self.backend = backend
+        self.ip_per_minute = ip_per_minute
+        self.identifier_per_minute = identifier_per_minute
+
+    def check(self, scope: str, ip: str, identifier: str) -> float:
+        allowed, retry_ip = self.backend.consume(
+            f"{scope}:ip:{ip}", self.ip_per_minute, self.ip_per_minute / 60.0
+        )
+        if not allowed:
+            return retry_ip
+        allowed, retry_id = self.backend.consume(
+            f"{scope}:id:{identifier.strip().lower()}", self.identifier_per_minute, self.identifier_per_minute / 60.0
+        )
+        return 0.0 if allowed else retry_id
+
+
+def _build_backend():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBucketBackend(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryBucketBackend()
+
+
+login_limiter = LoginRateLimiter(
+    backend=_build_backend(),
+    ip_per_minute=settings.LOGIN_RATE_LIMIT_PER_IP,
+    identifier_per_minute=settings.LOGIN_RATE_LIMIT_PER_IDENTIFIER,
+)
@@ -0,0 +1,157 @@
+import json
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.unit_of_work import after_commit, after_rollback
+
+# Espaces de noms invalidés en bloc par les écritures. Leur génération sert aussi
+# de numéro de version pour les ETag des routes de lecture (app/api/etags.py).
+DEPARTMENTS = "departments"
+TEMPLATES = "templates"
+DOCUMENTS = "documents"
+# changements d'onboarding en masse (propagation de templates, nouvelles versions de plan)
+ONBOARDING = "onboarding"
+
+
+def user_checklist_namespace(user_id: int) -> str:
+    # checklist d'un user (items copiés + progression sur son plan)
+    return f"checklists:{user_id}"
+
+
+class InMemoryCacheBackend:
+    """Cache dans le process (un worker) : TTL + taille bornée."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._process = uuid.uuid4().hex[:8]
+
+    def epoch(self) -> str:
+        # compteurs propres au process et remis à zéro au redémarrage : les versions ne sont
+        # comparables que dans ce process, et au plus pendant un TTL (écritures d'autres workers)
+        return f"{self._process}-{int(time.time() // self._cache.ttl)}"
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self._cache.stats()}
+
+
+class RedisCacheBackend:
+    """Cache partagé entre workers (serveur Redis ou compatible) ; la taille est bornée côté serveur (maxmemory)."""
+
+    def __init__(self, url: str, prefix: str = "readcache:"):
+        import redis  # dépendance optionnelle, seulement pour ce backend
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def epoch(self) -> str:
+        # compteurs partagés par tous les workers
+        return "shared"
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(self.prefix + key)
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def counter(self, key: str) -> int:
+        return int(self._client.get(self.prefix + key) or 0)
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(self.prefix + key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+class ReadCache:
+    """
+    Lectures rarement modifiées (départements, templates), sérialisées en JSON.
+    Chaque espace de noms a une génération : l'invalider = l'incrémenter, ce qui rend
+    obsolètes toutes ses clés d'un coup, pour tous les workers qui partagent le backend.
+    """
+
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{namespace}:{self.version(namespace)}:{key}"
+
+    def get_or_load(self, namespace: str, key: str, load: Callable[[], Any]) -> Any:
+        full_key = self._key(namespace, key)
+        cached = self.backend.get(full_key)
+        if cached is not None:
+            return json.loads(cached)
+        value = load()
+        self.backend.set(full_key, json.dumps(value), self.ttl)
+        return value
+
+    async def get_or_load_async(self, namespace: str, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        # mêmes clés que get_or_load : les routes sync et async partagent les entrées
+        full_key = self._key(namespace, key)
+        cached = self.backend.get(full_key)
+        if cached is not None:
+            return json.loads(cached)
+        value = await load()
+        self.backend.set(full_key, json.dumps(value), self.ttl)
+        return value
+
+    def version(self, namespace: str) -> int:
+        return self.backend.counter("gen:" + namespace)
+
+    def epoch(self) -> str:
+        """Domaine de validité des versions (à inclure dans les ETag)."""
+        return self.backend.epoch()
+
+    def invalidate(self, namespace: str) -> None:
+        self.backend.incr("gen:" + namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.backend.stats()
+
+
+def _build_backend():
+    if settings.READ_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.READ_CACHE_REDIS_URL)
+    return InMemoryCacheBackend(settings.READ_CACHE_MAXSIZE, settings.READ_CACHE_TTL_SECONDS)
+
+
+read_cache = ReadCache(_build_backend(), ttl=settings.READ_CACHE_TTL_SECONDS)
+
+
+def invalidate_on_write(db, namespace: str) -> None:
+    """
+    Écriture dans la transaction de `db` : invalide tout de suite (la requête relit ses
+    propres écritures), puis à nouveau à la fin de la transaction, pour écarter ce qu'un
+    autre worker aurait mis en cache entre-temps à partir de l'état d'avant.
+    """
+    read_cache.invalidate(namespace)
+    after_commit(db, read_cache.invalidate, namespace)
+    after_rollback(db, read_cache.invalidate, namespace)
+
+
+def invalidate_user_checklists(db, user_ids) -> None:
+    for user_id in {uid for uid in user_ids if uid is not None}:
+        invalidate_on_write(db, user_checklist_namespace(user_id))
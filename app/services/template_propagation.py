@@ -0,0 +1,180 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Boolean, Integer, String, delete, insert, literal, select, update
+
+from app.core.config import settings
+from app.crud.checklist_crud import list_template_titles
+from app.crud.progress_crud import refresh_user_progress
+from app.db.session import SessionLocal
+from app.models.checklist import ChecklistItem
+from app.models.propagation_job import PropagationJob
+from app.models.user import User
+from app.services.onboarding_plans import refresh_department_plans
+from app.services.read_cache import ONBOARDING, read_cache
+
+# nombre d'utilisateurs traités par instruction (et par commit)
+USER_BATCH_SIZE = 500
+# jobs conservés pour la consultation de la progression
+JOB_RETENTION = timedelta(days=7)
+
+
+def get_job(db, job_id: str) -> Optional[PropagationJob]:
+    return db.get(PropagationJob, job_id)
+
+
+def create_job(db, action: str, title: str, department_id: Optional[int],
+               old_title: Optional[str] = None, old_department_id: Optional[int] = None) -> PropagationJob:
+    """Job enregistré dans la transaction de la requête : visible (et exécuté) une fois celle-ci validée."""
+    db.execute(delete(PropagationJob).where(PropagationJob.created_at < datetime.utcnow() - JOB_RETENTION))
+    job = PropagationJob(
+        id=uuid.uuid4().hex, action=action, title=title, department_id=department_id,
+        old_title=old_title, old_department_id=old_department_id, status="pending",
+        total_users=0, processed_users=0, inserted=0, updated=0, deleted=0, created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def _user_ids(db, department_id: Optional[int]) -> List[int]:
+    # template global → tous les users ; sinon users du département
+    q = db.query(User.id)
+    if department_id is not None:
+        q = q.filter(User.department_id == department_id)
+    return [row[0] for row in q.order_by(User.id)]
+
+
+def _chunks(values: List[int]):
+    for i in range(0, len(values), USER_BATCH_SIZE):
+        yield values[i:i + USER_BATCH_SIZE]
+
+
+def _insert_missing(db, user_ids: List[int], title: str, department_id: Optional[int]) -> int:
+    # INSERT ... SELECT : un item par user qui n'a pas encore ce titre (idempotent)
+    already_has = (
+        select(ChecklistItem.id)
+        .where(ChecklistItem.user_id == User.id, ChecklistItem.title == title)
+        .exists()
+    )
+    rows = select(
+        literal(title, String),
+        literal(department_id, Integer),
+        User.id,
+        literal(False, Boolean),
+    ).where(User.id.in_(user_ids), ~already_has)
+    stmt = insert(ChecklistItem).from_select(["title", "department_id", "user_id", "completed"], rows)
+    return db.execute(stmt).rowcount or 0
+
+
+def _remove_copies(db, user_ids: List[int], title: str, department_id: Optional[int],
+                   remaining: Dict[str, Optional[int]]) -> (int, int):
+    """
+    Retire les copies d'un template départemental supprimé/déplacé.
+    Même règle que assign_onboarding_for_user : si un autre template de même titre
+    s'applique encore, on se contente de réaligner department_id ; les items
+    globaux (department_id NULL) ne sont jamais supprimés.
+    """
+    if department_id is None:
+        return 0, 0
+    scope = (
+        ChecklistItem.user_id.in_(user_ids),
+        ChecklistItem.title == title,
+        ChecklistItem.department_id == department_id,
+    )
+    if title in remaining:
+        stmt = update(ChecklistItem).where(*scope).values(department_id=remaining[title])
+        return 0, db.execute(stmt.execution_options(synchronize_session=False)).rowcount or 0
+    stmt = delete(ChecklistItem).where(*scope)
+    return db.execute(stmt.execution_options(synchronize_session=False)).rowcount or 0, 0
+
+
+def _rename_copies(db, user_ids: List[int], old_title: str, title: str, department_id: Optional[int]) -> int:
+    # renommage dans le même département : on garde l'état "completed" des users
+    stmt = (
+        update(ChecklistItem)
+        .where(
+            ChecklistItem.user_id.in_(user_ids),
+            ChecklistItem.title == old_title,
+            ChecklistItem.department_id == department_id,
+        )
+        .values(title=title)
+    )
+    return db.execute(stmt.execution_options(synchronize_session=False)).rowcount or 0
+
+
+def run_propagation(job_id: str) -> None:
+    """
+    Exécute le job par lots de users, un commit par lot ; relançable sans effet de bord.
+    La progression du job est validée avec chaque lot.
+    """
+    db = SessionLocal()
+    job = get_job(db, job_id)
+    if job is None:
+        db.close()
+        return
+    try:
+        job.status = "running"
+        db.commit()
+        if settings.ONBOARDING_MODE == "plan":
+            # mode plan : pas de copie par user, une nouvelle version de plan par département
+            departments = {job.department_id}
+            if job.action == "update":
+                departments.add(job.old_department_id)
+            job.updated = refresh_department_plans(db, departments)
+            db.commit()
+            job.status = "done"
+            return
+
+        old_users = _user_ids(db, job.old_department_id) if job.action == "update" else []
+        new_users = _user_ids(db, job.department_id)
+        job.total_users = len(set(old_users) | set(new_users)) if job.action == "update" else len(new_users)
+
+        if job.action == "delete":
+            remaining = list_template_titles(db, job.department_id)
+            for chunk in _chunks(new_users):
+                deleted, updated = _remove_copies(db, chunk, job.title, job.department_id, remaining)
+                job.deleted += deleted
+                job.updated += updated
+                refresh_user_progress(db, chunk)
+                db.commit()
+                job.processed_users += len(chunk)
+
+        elif job.action == "update" and job.old_department_id != job.department_id:
+            # changement de département : retrait côté ancien, ajout côté nouveau
+            remaining = list_template_titles(db, job.old_department_id)
+            for chunk in _chunks(old_users):
+                deleted, updated = _remove_copies(db, chunk, job.old_title, job.old_department_id, remaining)
+                job.deleted += deleted
+                job.updated += updated
+                refresh_user_progress(db, chunk)
+                db.commit()
+                job.processed_users += len(chunk)
+            for chunk in _chunks(new_users):
+                job.inserted += _insert_missing(db, chunk, job.title, job.department_id)
+                refresh_user_progress(db, chunk)
+                db.commit()
+            job.processed_users = job.total_users
+
+        else:
+            # create, ou update dans le même département (renommage éventuel)
+            for chunk in _chunks(new_users):
+                if job.action == "update" and job.old_title != job.title:
+                    job.updated += _rename_copies(db, chunk, job.old_title, job.title, job.department_id)
+                job.inserted += _insert_missing(db, chunk, job.title, job.department_id)
+                refresh_user_progress(db, chunk)
+                db.commit()
+                job.processed_users += len(chunk)
+
+        job.status = "done"
+    except Exception as exc:
+        db.rollback()
+        job.status = "failed"
+        job.error = str(exc)
+    finally:
+        # nouvelles versions (ETag) des checklists : une fois, en fin de job
+        read_cache.invalidate(ONBOARDING)
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        db.close()
@@ -0,0 +1,109 @@
+import datetime
+import hashlib
+import math
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.revoked_token_crud import (
+    add_revoked_token,
+    is_token_revoked,
+    list_active_revoked_jtis,
+    purge_expired_revoked_tokens,
+)
+
+
+class BloomFilter:
+    """Filtre de Bloom à taille fixe : pas de faux négatifs, faux positifs ~ error_rate."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevokedTokenSet:
+    """
+    Ensemble des refresh tokens (jti) révoqués, borné en mémoire.
+    Deux générations de filtres de Bloom, chacune couvrant une durée de vie de
+    refresh token : au-delà, un jti révoqué a de toute façon expiré, on jette
+    la plus ancienne génération. La table revoked_tokens reste la source de vérité :
+    elle confirme les positifs (lookup par clé primaire) et garantit l'usage unique.
+    """
+
+    def __init__(self, capacity: int, window_seconds: float):
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._current = BloomFilter(capacity)
+        self._previous = BloomFilter(capacity)
+        self._rotated_at = time.monotonic()
+        self._count = 0
+
+    def _maybe_rotate(self) -> None:
+        if time.monotonic() - self._rotated_at >= self.window_seconds or self._count >= self.capacity:
+            self._previous = self._current
+            self._current = BloomFilter(self.capacity)
+            self._rotated_at = time.monotonic()
+            self._count = 0
+
+    def _remember(self, jti: str) -> None:
+        with self._lock:
+            self._maybe_rotate()
+            self._current.add(jti)
+            self._count += 1
+
+    def might_contain(self, jti: str) -> bool:
+        with self._lock:
+            return jti in self._current or jti in self._previous
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        # négatif du filtre = certainement pas révoqué dans ce process, aucune requête
+        if not self.might_contain(jti):
+            return False
+        return is_token_revoked(db, jti)
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime.datetime) -> bool:
+        """
+        Révoque un jti ; False s'il l'était déjà (réutilisation d'un token tourné).
+        Jti connu du filtre et confirmé en base : refus sans écriture ; sinon l'INSERT
+        ... ON CONFLICT DO NOTHING tranche seul, y compris entre requêtes concurrentes.
+        """
+        if self.is_revoked(db, jti):
+            return False
+        inserted = add_revoked_token(db, jti, expires_at)
+        self._remember(jti)
+        return inserted
+
+    def load(self, db: Session) -> None:
+        """Purge les jti expirés et charge les autres dans le filtre (au démarrage)."""
+        purge_expired_revoked_tokens(db)
+        for jti in list_active_revoked_jtis(db):
+            self._remember(jti)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"capacity": self.capacity, "current_generation_count": self._count,
+                    "bits_per_generation": self._current.size, "hashes": self._current.hashes}
+
+
+revoked_tokens = RevokedTokenSet(
+    capacity=settings.REVOKED_TOKEN_BLOOM_CAPACITY,
+    window_seconds=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+)
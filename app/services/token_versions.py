@@ -0,0 +1,58 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+# Marqueur "user inexistant" (TTLCache traite None comme un miss)
+_DELETED = -1
+
+
+class TokenVersionCache:
+    """
+    Petit cache user_id -> token_version utilisé pour révoquer les JWT sans
+    recharger le user. Un token dont le claim `ver` diffère de la version
+    courante est refusé.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, db: Session, user_id: int) -> Optional[int]:
+        version = self._cache.get(user_id)
+        if version is None:
+            row = db.query(User.token_version).filter(User.id == user_id).first()
+            version = row[0] if row else _DELETED
+            self._cache.set(user_id, version)
+        return None if version == _DELETED else version
+
+    async def get_async(self, db: AsyncSession, user_id: int) -> Optional[int]:
+        # même cache que get() : seules les lectures manquantes passent par l'AsyncSession
+        version = self._cache.get(user_id)
+        if version is None:
+            row = (await db.execute(select(User.token_version).where(User.id == user_id))).first()
+            version = row[0] if row else _DELETED
+            self._cache.set(user_id, version)
+        return None if version == _DELETED else version
+
+    def set(self, user_id: int, version: int) -> None:
+        self._cache.set(user_id, version)
+
+    def forget(self, user_id: int) -> None:
+        self._cache.set(user_id, _DELETED)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+token_versions = TokenVersionCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS,
+)
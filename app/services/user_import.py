@@ -0,0 +1,141 @@
+import codecs
+import csv
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.hashing import hash_passwords_parallel
+from app.crud.loaders import loader_for
+from app.crud.user_crud import bulk_create_users, find_taken_logins
+from app.models.department import Department
+from app.schemas.user import UserCreate
+from app.services.onboarding import assign_onboarding_for_new_users
+
+# users insérés (et hashés) par lot
+IMPORT_BATCH_SIZE = 500
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(stream, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Lit le fichier ligne à ligne (sans le charger en mémoire).
+    Produit (numéro de ligne, données brutes, erreur de parsing).
+    """
+    lines = codecs.iterdecode(stream, "utf-8")
+    if fmt == "ndjson":
+        for row_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line), None
+            except ValueError as exc:
+                yield row_number, None, f"Invalid JSON: {exc}"
+        return
+
+    reader = csv.DictReader(lines)
+    for row_number, raw in enumerate(reader, start=2):  # ligne 1 = en-tête
+        # cellules vides → None (full_name, department_id optionnels)
+        yield row_number, {k: (v if v != "" else None) for k, v in raw.items() if k}, None
+
+
+def _import_batch(db, batch: List[Tuple[int, UserCreate]], report: List[dict]) -> List[dict]:
+    """Insère un lot déjà validé ; retourne les users créés (pour les emails de bienvenue)."""
+    taken_emails, taken_usernames = find_taken_logins(
+        db, {u.email for _, u in batch}, {u.username for _, u in batch}
+    )
+    # départements cités par le lot : un seul IN (...), déjà chargés → aucune requête
+    valid_departments = loader_for(db, Department).load_many({u.department_id for _, u in batch})
+
+    accepted: List[Tuple[int, UserCreate]] = []
+    seen_emails, seen_usernames = set(), set()
+    for row_number, user_in in batch:
+        errors = []
+        if user_in.email in taken_emails or user_in.email in seen_emails:
+            errors.append("email already exists")
+        if user_in.username in taken_usernames or user_in.username in seen_usernames:
+            errors.append("username already exists")
+        if user_in.department_id is not None and user_in.department_id not in valid_departments:
+            errors.append("department not found")
+        if errors:
+            report.append({"row": row_number, "status": "error", "email": user_in.email, "errors": errors})
+            continue
+        seen_emails.add(user_in.email)
+        seen_usernames.add(user_in.username)
+        accepted.append((row_number, user_in))
+
+    if not accepted:
+        return []
+
+    # bcrypt en parallèle sur plusieurs processus
+    hashes = hash_passwords_parallel([u.password for _, u in accepted])
+    rows = [
+        {
+            "username": u.username,
+            "full_name": u.full_name,
+            "email": u.email,
+            "hashed_password": hashed,
+            "role": u.role,
+            "department_id": u.department_id,
+        }
+        for (_, u), hashed in zip(accepted, hashes)
+    ]
+
+    try:
+        ids = bulk_create_users(db, rows)
+        assign_onboarding_for_new_users(db, [(ids[u.email], u.department_id) for _, u in accepted])
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        for row_number, u in accepted:
+            report.append({"row": row_number, "status": "error", "email": u.email, "errors": [str(exc)]})
+        return []
+
+    created = []
+    for row_number, u in accepted:
+        report.append({"row": row_number, "status": "created", "user_id": ids[u.email], "email": u.email})
+        created.append({"email": u.email, "name": u.full_name or u.username})
+    return created
+
+
+def import_users(db, stream, fmt: str) -> Tuple[Dict, List[dict]]:
+    """
+    Import en masse : validation UserCreate, hash parallèle, INSERT par lots,
+    onboarding ensembliste. Retourne (rapport par ligne, users créés).
+    """
+    report: List[dict] = []
+    created: List[dict] = []
+    batch: List[Tuple[int, UserCreate]] = []
+
+    for row_number, data, parse_error in iter_rows(stream, fmt):
+        if parse_error:
+            report.append({"row": row_number, "status": "error", "errors": [parse_error]})
+            continue
+        try:
+            batch.append((row_number, UserCreate(**data)))
+        except (ValidationError, TypeError) as exc:
+            errors = [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()] \
+                if isinstance(exc, ValidationError) else [str(exc)]
+            report.append({"row": row_number, "status": "error",
+                           "email": data.get("email") if isinstance(data, dict) else None, "errors": errors})
+            continue
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            created += _import_batch(db, batch, report)
+            batch = []
+
+    if batch:
+        created += _import_batch(db, batch, report)
+
+    report.sort(key=lambda r: r["row"])
+    summary = {
+        "created": sum(1 for r in report if r["status"] == "created"),
+        "failed": sum(1 for r in report if r["status"] == "error"),
+        "rows": report,
+    }
+    return summary, created
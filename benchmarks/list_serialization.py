@@ -0,0 +1,55 @@
+
+# Microbenchmark de sérialisation des listes (/documents, /checklists) : 1000 lignes.
+#   python -m benchmarks.list_serialization
+# "pydantic" : chemin response_model (from_orm + validation + json) ;
+# "projection" : lignes déjà projetées sur le schéma, encodées par FastJSONResponse.
+import json
+import timeit
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.responses import FastJSONResponse
+from app.schemas.checklist import ChecklistOut
+from app.schemas.document import DocumentOut
+
+ROWS = 1000
+REPEAT = 20
+
+
+def _documents():
+    return [
+        {"id": i, "title": f"Document {i}", "original_filename": f"doc_{i}.pdf",
+         "content_type": "application/pdf", "department_id": i % 7 or None, "uploaded_by": 1}
+        for i in range(1, ROWS + 1)
+    ]
+
+
+def _checklist_items():
+    return [
+        {"id": i, "title": f"Étape {i}", "completed": i % 3 == 0, "user_id": 42,
+         "department_id": i % 5 or None, "source": "item"}
+        for i in range(1, ROWS + 1)
+    ]
+
+
+def _pydantic_path(schema, objects) -> bytes:
+    models = [schema.from_orm(obj) for obj in objects]
+    return json.dumps(jsonable_encoder(models)).encode("utf-8")
+
+
+def _projection_path(rows) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def main() -> None:
+    for name, schema, rows in (("documents", DocumentOut, _documents()),
+                               ("checklists", ChecklistOut, _checklist_items())):
+        objects = [SimpleNamespace(**row) for row in rows]
+        slow = min(timeit.repeat(lambda: _pydantic_path(schema, objects), number=1, repeat=REPEAT))
+        fast = min(timeit.repeat(lambda: _projection_path(rows), number=1, repeat=REPEAT))
+        print(f"{name:<11} pydantic {slow * 1000:7.2f} ms   projection {fast * 1000:7.2f} ms   x{slow / fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Coût d'assign_onboarding_for_user (mode "copy") selon le nombre de templates : 10 -> 500.
+#   python -m benchmarks.onboarding_scaling [--users 20]
+# "nouveau" : user sans item (INSERT groupé) ; "mutation" : changement de département
+# (DELETE/UPDATE/INSERT groupés). Chaque passe commit, comme la route ; le nombre de requêtes
+# SQL par appel doit rester constant quand le nombre de templates augmente.
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+_TMP = tempfile.mkdtemp(prefix="hellofmap-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/bench.db"
+os.environ["STORAGE_DIR"] = _TMP
+os.environ["ONBOARDING_MODE"] = "copy"
+
+from sqlalchemy import event, insert
+
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.models.checklist import ChecklistItem
+from app.models.department import Department
+from app.models.user import User
+from app.services.onboarding import assign_onboarding_for_user
+from app.services.read_cache import TEMPLATES, read_cache
+
+TEMPLATE_COUNTS = (10, 50, 100, 250, 500)
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def _seed(db, templates: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    first, second = Department(name="A"), Department(name="B")
+    db.add_all([first, second])
+    db.flush()
+    # moitié de templates globaux, moitié propres à chaque département
+    rows = [{"title": f"Global {n}", "department_id": None} for n in range(templates // 2)]
+    for dept in (first, second):
+        rows += [{"title": f"{dept.name} {n}", "department_id": dept.id} for n in range(templates - templates // 2)]
+    db.execute(insert(ChecklistItem), rows)
+    db.commit()
+    read_cache.invalidate(TEMPLATES)
+    return first, second
+
+
+def _timed(db, counter: _StatementCounter, user):
+    before = counter.count
+    start = time.perf_counter()
+    assign_onboarding_for_user(db, user)
+    db.commit()
+    return time.perf_counter() - start, counter.count - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+
+    counter = _StatementCounter()
+    print(f"{'templates':>9}  {'nouveau':>18}  {'mutation':>18}")
+    for templates in TEMPLATE_COUNTS:
+        db = SessionLocal()
+        try:
+            first, second = _seed(db, templates)
+            fresh, moved = [], []
+            for n in range(args.users):
+                user = User(username=f"user{n}", email=f"user{n}@example.com", hashed_password="x",
+                            role="EMPLOYEE", department_id=first.id)
+                db.add(user)
+                db.commit()
+                fresh.append(_timed(db, counter, user))
+                user.department_id = second.id
+                db.commit()
+                moved.append(_timed(db, counter, user))
+        finally:
+            db.close()
+        cells = [
+            f"{statistics.median(t for t, _ in runs) * 1000:7.2f} ms {max(q for _, q in runs):3d} req"
+            for runs in (fresh, moved)
+        ]
+        print(f"{templates:>9}  {cells[0]:>18}  {cells[1]:>18}")
+
+
+if __name__ == "__main__":
+    main()
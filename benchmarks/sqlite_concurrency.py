@@ -0,0 +1,127 @@
+# Complétions de checklist concurrentes sur SQLite : profil "default" (journal rollback)
+# contre profil "sqlite" (WAL, synchronous=NORMAL), à délai d'attente de verrou égal.
+#   python -m benchmarks.sqlite_concurrency [--threads 16] [--operations 200] [--write-ratio 0.2]
+#                                           [--busy-timeouts-ms 0,20,5000]
+# Chaque thread enchaîne des transactions courtes comme la route : complétion d'un item
+# (UPDATE ... RETURNING + compteurs d'avancement) ou lecture de sa checklist.
+# Compte les erreurs "database is locked" et le débit de chaque profil ; un délai court
+# reproduit une base saturée (attente de verrou plus longue que le délai).
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+_TMP = tempfile.mkdtemp(prefix="hellofmap-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/app.db"
+os.environ["STORAGE_DIR"] = _TMP
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import app.main  # noqa: F401  (enregistre tous les modèles)
+from app.core.config import settings
+from app.crud.checklist_crud import complete_checklist_item_if_allowed, list_checklist_items_for_user
+from app.crud.progress_crud import get_user_progress
+from app.db.session import build_engine
+from app.models.base import Base
+from app.models.checklist import ChecklistItem
+from app.models.user import User
+from app.schemas.user import Principal
+
+USERS = 50
+ITEMS_PER_USER = 40
+
+
+def _seed(engine) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x",
+             "role": "EMPLOYEE", "token_version": 0}
+            for i in range(1, USERS + 1)
+        ])
+        conn.execute(insert(ChecklistItem), [
+            {"title": f"Étape {n}", "user_id": i, "completed": False}
+            for i in range(1, USERS + 1) for n in range(ITEMS_PER_USER)
+        ])
+
+
+def _operation(Session, user_id: int, item_id: int, write: bool) -> None:
+    db = Session()
+    try:
+        if write:
+            principal = Principal(id=user_id, role="EMPLOYEE", department_id=None, token_version=0)
+            complete_checklist_item_if_allowed(db, item_id, principal)
+        else:
+            list_checklist_items_for_user(db, user_id)
+            get_user_progress(db, db.get(User, user_id))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _engine(profile: str, url: str, busy_timeout_ms: int):
+    if profile == "sqlite":
+        settings.SQLITE_BUSY_TIMEOUT_MS = busy_timeout_ms
+        return build_engine(url, profile)
+    # journal rollback, seul le délai du driver est réglé
+    return create_engine(url, connect_args={"check_same_thread": False, "timeout": busy_timeout_ms / 1000})
+
+
+def run(profile: str, busy_timeout_ms: int, threads: int, operations: int, write_ratio: float):
+    url = f"sqlite:///{_TMP}/{profile}-{busy_timeout_ms}.db"
+    engine = _engine(profile, url, busy_timeout_ms)
+    _seed(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    item_ids = {u: [(u - 1) * ITEMS_PER_USER + n + 1 for n in range(ITEMS_PER_USER)] for u in range(1, USERS + 1)}
+    locked, other = {"lectures": 0, "écritures": 0}, []
+    counter_lock = threading.Lock()
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        for _ in range(operations):
+            user_id = rng.randint(1, USERS)
+            write = rng.random() < write_ratio
+            try:
+                _operation(Session, user_id, rng.choice(item_ids[user_id]), write)
+            except OperationalError as exc:
+                with counter_lock:
+                    if "database is locked" in str(exc):
+                        locked["écritures" if write else "lectures"] += 1
+                    else:
+                        other.append(exc)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return threads * operations / elapsed, locked, len(other)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--busy-timeouts-ms", default=f"0,20,{settings.SQLITE_BUSY_TIMEOUT_MS}")
+    args = parser.parse_args()
+
+    for busy_timeout_ms in (int(t) for t in args.busy_timeouts_ms.split(",")):
+        for profile in ("default", "sqlite"):
+            ops, locked, other = run(profile, busy_timeout_ms, args.threads, args.operations, args.write_ratio)
+            print(f"timeout {busy_timeout_ms:>5} ms  {profile:<8} {ops:8.0f} op/s   'database is locked' : "
+                  f"{locked['lectures']:5d} lectures, {locked['écritures']:5d} écritures   autres erreurs {other}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Routes sync (threadpool + Session) contre routes async (AsyncSession) sous charge concurrente.
+#   python -m benchmarks.sync_vs_async [--requests 2000] [--concurrency 1,16,64]
+# Base SQLite jetable ; requêtes envoyées en ASGI direct (httpx.ASGITransport), sans réseau.
+# Le cache des principals est vidé avant chaque passe : l'authentification lit aussi la base.
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_TMP = tempfile.mkdtemp(prefix="hellofmap-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/bench.db"
+os.environ["STORAGE_DIR"] = _TMP
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import async_routes
+from app.api.auth import issue_tokens
+from app.db.session import SessionLocal
+from app.main import app as sync_app
+from app.models.checklist import ChecklistItem
+from app.models.department import Department
+from app.models.document import Document
+from app.models.user import User
+from app.services.principal_cache import principal_cache
+
+USERS = 50
+ITEMS_PER_USER = 20
+DOCUMENTS = 200
+PATHS = ("/api/checklists/me", "/api/documents/?limit=50")
+
+
+def _async_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(async_routes.router, prefix="/api")
+    return app
+
+
+def _seed() -> list:
+    db = SessionLocal()
+    try:
+        dept = Department(name="Bench")
+        db.add(dept)
+        db.flush()
+        users = [User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x",
+                      role="EMPLOYEE", department_id=dept.id) for i in range(USERS)]
+        db.add_all(users)
+        db.flush()
+        db.add_all(ChecklistItem(title=f"Étape {n}", user_id=u.id, department_id=dept.id)
+                   for u in users for n in range(ITEMS_PER_USER))
+        db.add_all(Document(title=f"Doc {n}", stored_filename=f"doc_{n}.pdf", original_filename=f"doc_{n}.pdf",
+                            path=f"doc_{n}.pdf", content_type="application/pdf", department_id=dept.id,
+                            uploaded_by=users[0].id)
+                   for n in range(DOCUMENTS))
+        db.commit()
+        return [{"Authorization": f"Bearer {issue_tokens(u)['access_token']}"} for u in users]
+    finally:
+        db.close()
+
+
+async def _run(app: FastAPI, headers: list, requests: int, concurrency: int):
+    principal_cache.clear()
+    latencies = []
+    queue = asyncio.Queue()
+    for n in range(requests):
+        queue.put_nowait(n)
+
+    async def worker(client: httpx.AsyncClient):
+        while not queue.empty():
+            n = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(PATHS[n % len(PATHS)], headers=headers[n % len(headers)])
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,16,64")
+    args = parser.parse_args()
+
+    headers = _seed()
+    apps = (("sync", sync_app), ("async", _async_app()))
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        for name, app in apps:
+            rps, p50, p99 = asyncio.run(_run(app, headers, args.requests, concurrency))
+            print(f"c={concurrency:<4} {name:<6} {rps:8.0f} req/s   p50 {p50 * 1000:7.2f} ms   p99 {p99 * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+
+# Base SQLite et stockage jetables, avant tout import de l'application (settings lus à l'import)
+_TMP = tempfile.mkdtemp(prefix="hellofmap-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/test.db"
+os.environ["STORAGE_DIR"] = _TMP
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.api.auth import issue_tokens
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.base import Base
+from app.models.department import Department
+from app.models.user import User
+from app.services.principal_cache import principal_cache
+from app.services.read_cache import _build_backend, read_cache
+from app.services.token_versions import token_versions
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    # caches en mémoire : les ids sont réutilisés d'un test à l'autre
+    principal_cache.clear()
+    token_versions.clear()
+    read_cache.backend = _build_backend()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    return TestClient(app)
+
+
+@pytest.fixture
+def statements():
+    """Instructions SQL émises sur le moteur ; vider la liste avant la partie mesurée."""
+    emitted = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        emitted.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    yield emitted
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.fixture
+def make_department(db):
+    def make(name: str) -> Department:
+        dept = Department(name=name)
+        db.add(dept)
+        db.commit()
+        return dept
+    return make
+
+
+@pytest.fixture
+def make_user(db):
+    def make(username: str, role: str = "EMPLOYEE", department_id=None) -> User:
+        # mot de passe inutilisé : les tests s'authentifient par token
+        user = User(username=username, email=f"{username}@example.com", hashed_password="x",
+                    role=role, department_id=department_id)
+        db.add(user)
+        db.commit()
+        return user
+    return make
+
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {issue_tokens(user)['access_token']}"}
@@ -0,0 +1,70 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import async_routes
+from app.db.session import get_db
+from app.models.checklist import ChecklistItem
+from app.services.principal_cache import principal_cache
+from tests.conftest import auth_headers
+
+
+def _no_sync_session():
+    raise AssertionError("les routes async ne doivent pas ouvrir de Session sync")
+
+
+@pytest.fixture
+def async_client(db):
+    # routes async seules, comme avec DB_ASYNC=True ; toute dépendance à get_db échoue
+    app = FastAPI()
+    app.include_router(async_routes.router, prefix="/api")
+    app.dependency_overrides[get_db] = _no_sync_session
+    principal_cache.clear()
+    return TestClient(app)
+
+
+def test_my_checklist_authenticates_through_async_session(async_client, db, make_user):
+    user = make_user("alice")
+    db.add(ChecklistItem(title="Badge", user_id=user.id))
+    db.commit()
+
+    response = async_client.get("/api/checklists/me", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert [row["title"] for row in response.json()] == ["Badge"]
+
+
+def test_complete_item_async(async_client, db, make_user):
+    user = make_user("alice")
+    item = ChecklistItem(title="Badge", user_id=user.id)
+    db.add(item)
+    db.commit()
+
+    response = async_client.post(f"/api/checklists/{item.id}/complete", headers=auth_headers(user))
+    assert response.status_code == 200 and response.json()["completed"] is True
+
+
+def test_async_role_check(async_client, make_user):
+    assert async_client.get("/api/departments/", headers=auth_headers(make_user("alice"))).status_code == 403
+    admin = make_user("admin", role="RH")
+    assert async_client.get("/api/departments/", headers=auth_headers(admin)).status_code == 200
+
+
+def test_revoked_token_rejected_async(async_client, db, make_user):
+    user = make_user("alice")
+    headers = auth_headers(user)
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+    assert async_client.get("/api/checklists/me", headers=headers).status_code == 401
+
+
+def test_async_departments_share_the_read_cache(async_client, db, make_user, make_department):
+    from app.crud.department_crud import list_departments
+
+    make_department("Sales")
+    headers = auth_headers(make_user("admin", role="RH"))
+    first = async_client.get("/api/departments/", headers=headers)
+    assert [row["name"] for row in first.json()] == ["Sales"]
+
+    make_department("Legal")  # écrit sans passer par le CRUD : le cache n'est pas invalidé
+    assert async_client.get("/api/departments/", headers=headers).json() == first.json()
+    assert [dept.name for dept in list_departments(db)] == ["Sales"]
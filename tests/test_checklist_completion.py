@@ -0,0 +1,54 @@
+from app.crud.progress_crud import reconcile_progress
+from app.models.checklist import ChecklistItem
+from app.models.progress import DepartmentChecklistProgress, UserChecklistProgress
+from tests.conftest import auth_headers
+
+
+def _setup(db, make_user, make_department):
+    dept = make_department("IT")
+    user = make_user("alice", department_id=dept.id)
+    items = [ChecklistItem(title=title, user_id=user.id) for title in ("Badge", "Laptop", "Mentor")]
+    db.add_all(items)
+    db.flush()
+    reconcile_progress(db)
+    db.commit()
+    return user, dept.id, [item.id for item in items]
+
+
+def test_complete_hot_path_statement_count(client, db, make_user, make_department, statements):
+    user, dept_id, (first, second, _) = _setup(db, make_user, make_department)
+    headers = auth_headers(user)
+    assert client.get("/api/checklists/me", headers=headers).status_code == 200  # principal en cache
+
+    statements.clear()
+    response = client.post(f"/api/checklists/{first}/complete", headers=headers)
+    assert response.status_code == 200 and response.json()["completed"] is True
+    # UPDATE ... RETURNING de l'item + décalage relatif du user + upsert relatif du département
+    assert len(statements) == 3
+    assert statements[0].startswith("UPDATE checklist_items")
+    assert statements[1].startswith("UPDATE user_checklist_progress")
+    assert statements[2].startswith("INSERT INTO department_checklist_progress")
+
+    db.expire_all()
+    user_row = db.get(UserChecklistProgress, user.id)
+    assert (user_row.total, user_row.completed, user_row.oldest_open_item_id) == (3, 1, second)
+    dept_row = db.get(DepartmentChecklistProgress, dept_id)
+    assert (dept_row.users, dept_row.total, dept_row.completed, dept_row.oldest_open_item_id) == (1, 3, 1, second)
+
+
+def test_completing_twice_does_not_count_twice(client, db, make_user, make_department):
+    user, _, (first, _, _) = _setup(db, make_user, make_department)
+    headers = auth_headers(user)
+    assert client.post(f"/api/checklists/{first}/complete", headers=headers).status_code == 200
+    again = client.post(f"/api/checklists/{first}/complete", headers=headers)
+    assert again.status_code == 200 and again.json()["completed"] is True
+
+    db.expire_all()
+    assert db.get(UserChecklistProgress, user.id).completed == 1
+
+
+def test_complete_forbidden_and_missing(client, db, make_user, make_department):
+    _, _, (first, _, _) = _setup(db, make_user, make_department)
+    other = make_user("bob")
+    assert client.post(f"/api/checklists/{first}/complete", headers=auth_headers(other)).status_code == 403
+    assert client.post("/api/checklists/9999/complete", headers=auth_headers(other)).status_code == 404
@@ -0,0 +1,31 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware
+
+
+def _client(etag: str) -> TestClient:
+    async def page(request):
+        return PlainTextResponse("x" * 2048, headers={"ETag": etag})
+
+    app = Starlette(routes=[Route("/", page)])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, encodings=("gzip",))
+    return TestClient(app)
+
+
+def test_compressed_body_gets_a_weak_etag():
+    client = _client('"abc"')
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == 'W/"abc"'
+
+    identity = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"abc"'
+
+
+def test_weak_etag_is_kept_as_is():
+    response = _client('W/"abc"').get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["etag"] == 'W/"abc"'
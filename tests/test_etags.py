@@ -0,0 +1,25 @@
+from app.models.checklist import ChecklistItem
+from tests.conftest import auth_headers
+
+
+def test_batch_reassign_invalidates_new_owner_checklist(client, db, make_user):
+    admin = make_user("admin", role="SUPERADMIN")
+    old_owner = make_user("old")
+    new_owner = make_user("new")
+    item = ChecklistItem(title="Badge", user_id=old_owner.id)
+    db.add(item)
+    db.commit()
+
+    headers = auth_headers(new_owner)
+    first = client.get("/api/checklists/me", headers=headers)
+    assert first.status_code == 200 and first.json() == []
+    etag = first.headers["etag"]
+    assert client.get("/api/checklists/me", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    response = client.post("/api/checklists/batch/update", headers=auth_headers(admin),
+                           json={"ids": [item.id], "changes": {"user_id": new_owner.id}})
+    assert response.status_code == 200 and response.json()["succeeded"] == 1
+
+    after = client.get("/api/checklists/me", headers={**headers, "If-None-Match": etag})
+    assert after.status_code == 200
+    assert [row["title"] for row in after.json()] == ["Badge"]
@@ -0,0 +1,89 @@
+from app.crud.department_crud import get_department
+from app.crud.loaders import loader_for
+from app.crud.user_crud import get_user_by_id
+from app.models.user import User
+from app.db.session import SessionLocal
+from tests.conftest import auth_headers
+
+
+def test_loader_returns_existing_rows_from_a_fresh_session(make_user, make_department):
+    dept = make_department("Sales")
+    user = make_user("alice", department_id=dept.id)
+
+    session = SessionLocal()  # identity map vide : le loader doit faire la requête
+    try:
+        loaded = get_user_by_id(session, user.id)
+        assert loaded is not None and loaded.username == "alice"
+        assert get_department(session, dept.id).name == "Sales"
+        assert get_user_by_id(session, 999) is None
+    finally:
+        session.close()
+
+
+def test_loader_batches_primed_keys_and_dedupes(make_user):
+    ids = [make_user(f"user{i}").id for i in range(3)]
+    session = SessionLocal()
+    try:
+        loader = loader_for(session, User)
+        loader.prime(ids)
+        found = loader.load_many(ids + [ids[0]])
+        assert sorted(found) == sorted(ids)
+        assert loader.load(ids[1]).username == "user1"
+        assert loader.queries == 1
+    finally:
+        session.close()
+
+
+def test_loader_forgets_deleted_rows(make_user):
+    user_id = make_user("bob").id
+    session = SessionLocal()
+    try:
+        user = get_user_by_id(session, user_id)
+        session.delete(user)
+        session.flush()
+        assert get_user_by_id(session, user_id) is None
+    finally:
+        session.close()
+
+
+def test_principal_cache_miss_authenticates_through_loader(client, make_user):
+    user = make_user("carol")
+    response = client.get("/api/checklists/me", headers=auth_headers(user))
+    assert response.status_code == 200
+
+
+def test_user_import_resolves_departments_with_one_in_query(client, make_user, make_department, statements,
+                                                            monkeypatch):
+    from app.services import user_import
+
+    # le hash bcrypt (pool de processus) est hors sujet ici
+    monkeypatch.setattr(user_import, "hash_passwords_parallel", lambda passwords: ["x"] * len(passwords))
+    admin = make_user("root", role="SUPERADMIN")
+    dept_ids = [make_department(name).id for name in ("Sales", "Support", "Legal")]
+    rows = "".join(f"u{i},u{i}@example.com,secret,EMPLOYEE,{dept_id}\n" for i, dept_id in enumerate(dept_ids + [999]))
+    csv_file = ("users.csv", "username,email,password,role,department_id\n" + rows, "text/csv")
+
+    statements.clear()
+    response = client.post("/api/users/import", files={"file": csv_file}, headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    assert [row["status"] for row in response.json()["rows"]] == ["created"] * 3 + ["error"]
+    lookups = [sql for sql in statements if "FROM departments" in sql]
+    assert len(lookups) == 1 and " IN (" in lookups[0]
+
+
+def test_reassignment_checks_target_user(client, make_user, make_department, db):
+    from app.models.checklist import ChecklistItem
+
+    sales, legal = make_department("Sales"), make_department("Legal")
+    manager = make_user("manager", role="DEPT", department_id=sales.id)
+    outsider = make_user("outsider", department_id=legal.id)
+    item = ChecklistItem(title="Badge", user_id=manager.id, department_id=sales.id)
+    db.add(item)
+    db.commit()
+    headers = auth_headers(manager)
+
+    assert client.put(f"/api/checklists/{item.id}", json={"user_id": 999}, headers=headers).status_code == 404
+    response = client.post("/api/checklists/batch/update", headers=headers,
+                           json={"ids": [item.id], "changes": {"user_id": outsider.id}})
+    assert response.status_code == 403
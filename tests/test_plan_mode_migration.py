@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.models.checklist import ChecklistItem
+from app.models.onboarding_plan import UserStepProgress
+from app.crud.onboarding_plan_crud import has_copied_template_items
+from app.services.onboarding import assign_onboarding_for_user
+from tests.conftest import auth_headers
+
+
+def _onboard_in_copy_mode(db, make_department, make_user):
+    dept = make_department("IT")
+    db.add_all([ChecklistItem(title="Badge"), ChecklistItem(title="Laptop", department_id=dept.id)])
+    db.commit()
+    user = make_user("alice", department_id=dept.id)
+    assign_onboarding_for_user(db, user)
+    badge = db.query(ChecklistItem).filter_by(user_id=user.id, title="Badge").one()
+    badge.completed = True
+    db.add(ChecklistItem(title="Rencontrer le mentor", user_id=user.id))  # item propre au user
+    db.commit()
+    return user
+
+
+def test_switch_to_plan_mode_shows_no_duplicates(db, make_department, make_user, monkeypatch):
+    user = _onboard_in_copy_mode(db, make_department, make_user)
+
+    monkeypatch.setattr(settings, "ONBOARDING_MODE", "plan")
+    with TestClient(app) as client:  # démarrage : migration des copies
+        response = client.get("/api/checklists/me", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    rows = {row["title"]: row for row in response.json()}
+    assert len(rows) == len(response.json()) == 3
+    assert rows["Badge"]["source"] == "plan" and rows["Badge"]["completed"] is True
+    assert rows["Laptop"]["source"] == "plan" and rows["Laptop"]["completed"] is False
+    assert rows["Rencontrer le mentor"]["source"] == "item"
+
+    db.expire_all()
+    assert [item.title for item in db.query(ChecklistItem).filter_by(user_id=user.id)] == ["Rencontrer le mentor"]
+    assert db.query(UserStepProgress).filter_by(user_id=user.id).count() == 1
+    assert not has_copied_template_items(db)
@@ -0,0 +1,131 @@
+import threading
+
+from app.core.config import settings
+from app.crud.progress_crud import reconcile_progress
+from app.models.checklist import ChecklistItem
+from app.models.progress import DepartmentChecklistProgress, UserChecklistProgress
+from tests.conftest import auth_headers
+
+
+def _counters(db):
+    db.expire_all()
+    users = {(r.user_id, r.department_id, r.total, r.completed, r.oldest_open_item_id)
+             for r in db.query(UserChecklistProgress)}
+    # les départements vidés gardent une ligne à zéro ; la reconstruction ne la recrée pas
+    departments = {(r.department_key, r.users, r.total, r.completed, r.oldest_open_item_id)
+                   for r in db.query(DepartmentChecklistProgress) if r.users}
+    return users, departments
+
+
+def _assert_matches_rebuild(db):
+    maintained = _counters(db)
+    reconcile_progress(db)
+    db.commit()
+    assert _counters(db) == maintained
+
+
+def test_single_item_writes_match_rebuild(client, db, make_user, make_department):
+    it, hr = make_department("IT"), make_department("RH")
+    admin = make_user("admin", role="SUPERADMIN")
+    alice = make_user("alice", department_id=it.id)
+    bob = make_user("bob", department_id=hr.id)
+    headers = auth_headers(admin)
+
+    ids = [client.post("/api/checklists/", json={"title": t, "user_id": alice.id}, headers=headers).json()["id"]
+           for t in ("Badge", "Laptop", "Mentor")]
+    _assert_matches_rebuild(db)
+
+    assert client.post(f"/api/checklists/{ids[0]}/complete", headers=headers).status_code == 200
+    _assert_matches_rebuild(db)
+
+    # rouvrir, changer de propriétaire (autre département), supprimer
+    assert client.put(f"/api/checklists/{ids[0]}", json={"completed": False}, headers=headers).status_code == 200
+    _assert_matches_rebuild(db)
+    assert client.put(f"/api/checklists/{ids[1]}", json={"user_id": bob.id}, headers=headers).status_code == 200
+    _assert_matches_rebuild(db)
+    for item_id in ids:
+        assert client.delete(f"/api/checklists/{item_id}", headers=headers).status_code == 204
+    _assert_matches_rebuild(db)
+    assert _counters(db) == (set(), set())
+
+
+def test_company_progress_after_writes(client, db, make_user, make_department):
+    it = make_department("IT")
+    admin = make_user("admin", role="SUPERADMIN")
+    alice = make_user("alice", department_id=it.id)
+    headers = auth_headers(admin)
+    first = client.post("/api/checklists/", json={"title": "Badge", "user_id": alice.id}, headers=headers).json()
+    client.post("/api/checklists/", json={"title": "Laptop", "user_id": alice.id}, headers=headers)
+    client.post(f"/api/checklists/{first['id']}/complete", headers=headers)
+
+    body = client.get("/api/progress/company", headers=headers).json()
+    assert (body["users"], body["total"], body["completed"], body["percent"]) == (1, 2, 1, 50.0)
+    user = client.get(f"/api/progress/users/{alice.id}", headers=headers).json()
+    assert (user["total"], user["completed"]) == (2, 1)
+
+
+def test_batch_writes_match_rebuild(client, db, make_user, make_department):
+    it = make_department("IT")
+    admin = make_user("admin", role="SUPERADMIN")
+    alice = make_user("alice", department_id=it.id)
+    bob = make_user("bob")
+    items = [ChecklistItem(title=f"Étape {n}", user_id=(alice if n % 2 else bob).id) for n in range(6)]
+    db.add_all(items)
+    db.commit()
+    reconcile_progress(db)
+    db.commit()
+
+    response = client.post("/api/checklists/batch/complete", headers=auth_headers(admin),
+                           json={"ids": [item.id for item in items[:3]]})
+    assert response.status_code == 200 and response.json()["succeeded"] == 3
+    _assert_matches_rebuild(db)
+
+
+def test_reconcile_progress_counts_items(db, make_user, make_department):
+    it = make_department("IT")
+    alice = make_user("alice", department_id=it.id)
+    bob = make_user("bob", department_id=it.id)
+    carol = make_user("carol")
+    db.add_all([
+        ChecklistItem(title="A", user_id=alice.id, completed=True),
+        ChecklistItem(title="B", user_id=alice.id),
+        ChecklistItem(title="C", user_id=bob.id, completed=True),
+        ChecklistItem(title="D", user_id=carol.id),
+        ChecklistItem(title="Template"),  # template : non compté
+    ])
+    db.commit()
+
+    assert reconcile_progress(db) == 3
+    db.commit()
+    rows = {r.department_key: (r.users, r.total, r.completed) for r in db.query(DepartmentChecklistProgress)}
+    assert rows == {it.id: (2, 3, 2), 0: (1, 1, 0)}
+
+
+def test_concurrent_first_writes_for_a_user(client, db, make_user):
+    admin = make_user("admin", role="SUPERADMIN")
+    alice = make_user("alice")
+    headers = auth_headers(admin)
+    barrier = threading.Barrier(2)
+    statuses = []
+
+    def create(title):
+        barrier.wait()
+        statuses.append(client.post("/api/checklists/", json={"title": title, "user_id": alice.id},
+                                    headers=headers).status_code)
+
+    threads = [threading.Thread(target=create, args=(title,)) for title in ("Badge", "Laptop")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert statuses == [201, 201]
+    db.expire_all()
+    assert db.get(UserChecklistProgress, alice.id).total == 2
+
+
+def test_progress_endpoints_refuse_plan_mode(client, db, make_user, monkeypatch):
+    admin = make_user("admin", role="SUPERADMIN")
+    monkeypatch.setattr(settings, "ONBOARDING_MODE", "plan")
+    response = client.get("/api/progress/company", headers=auth_headers(admin))
+    assert response.status_code == 409
@@ -0,0 +1,24 @@
+from app.models.checklist import ChecklistItem
+from tests.conftest import auth_headers
+
+
+def test_propagation_job_is_stored_and_scoped_to_department(client, db, make_user, make_department):
+    sales, hr = make_department("Sales"), make_department("HR")
+    dept_admin = make_user("sales_admin", role="DEPT", department_id=sales.id)
+    other_admin = make_user("hr_admin", role="DEPT", department_id=hr.id)
+    employee = make_user("emp", department_id=sales.id)
+
+    response = client.post("/api/checklists/template", json={"title": "CRM training", "department_id": sales.id},
+                           headers=auth_headers(dept_admin))
+    assert response.status_code == 201
+    job_id = response.headers["x-propagation-job"]
+
+    # la tâche de fond a tourné (TestClient) et son état est lu en base
+    job = client.get(f"/api/checklists/propagation/{job_id}", headers=auth_headers(dept_admin))
+    assert job.status_code == 200
+    # employé + admin du département
+    assert job.json()["status"] == "done" and job.json()["inserted"] == 2
+    assert db.query(ChecklistItem).filter_by(user_id=employee.id, title="CRM training").count() == 1
+
+    forbidden = client.get(f"/api/checklists/propagation/{job_id}", headers=auth_headers(other_admin))
+    assert forbidden.status_code == 403
@@ -0,0 +1,137 @@
+# Plans SQLite (EXPLAIN QUERY PLAN) des requêtes chaudes : index utilisés, aucun parcours complet.
+# Seules les lectures non filtrées de toute une table (comptes et exports SUPERADMIN, totaux
+# de l'entreprise) parcourent la table par construction : elles ne figurent pas ici.
+import pytest
+from sqlalchemy import event
+
+from app.crud import checklist_crud, department_crud, document_crud, progress_crud, user_crud
+from app.crud import onboarding_plan_crud
+from app.crud.onboarding_plan_crud import list_plan_view
+from app.crud.pagination import encode_cursor
+from app.db.session import engine
+from app.models.checklist import ChecklistItem
+from app.schemas.user import Principal
+from app.services import exports, template_propagation
+from app.services.read_cache import TEMPLATES, read_cache
+
+DEPT = Principal(id=1, role="DEPT", department_id=2, token_version=0)
+MANAGER = Principal(id=1, role="MANAGER", department_id=2, token_version=0)
+EMPLOYEE = Principal(id=1, role="EMPLOYEE", department_id=2, token_version=0)
+
+
+@pytest.fixture
+def query_plans(db):
+    """Exécute l'appel CRUD et retourne le plan (lignes `detail`) de chaque requête émise."""
+    def plans(call):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        read_cache.invalidate(TEMPLATES)
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            call()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        connection = db.connection()
+        return [
+            [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            for statement, parameters in statements
+        ]
+    return plans
+
+
+def _full_scans(plan):
+    # un SCAN parcourt toute la table, même le long d'un index (« USING [COVERING] INDEX ») :
+    # seuls les SEARCH sont acceptés
+    return [detail for detail in plan if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW"]
+
+
+def _single_plan(plans):
+    assert len(plans) == 1
+    assert _full_scans(plans[0]) == []
+    return " | ".join(plans[0])
+
+
+@pytest.mark.parametrize("call, index", [
+    (lambda db: checklist_crud.list_checklist_items_for_user(db, 1), "ix_checklist_items_user_id"),
+    (lambda db: checklist_crud.list_department_template(db, 2), "ix_checklist_items_template_department"),
+    (lambda db: checklist_crud.list_template_titles(db, None), "ix_checklist_items_template_department"),
+    (lambda db: document_crud.list_documents(db, cursor=encode_cursor(["2024-01-01T00:00:00", 1])),
+     "ix_documents_uploaded_at_id"),
+    (lambda db: document_crud.list_documents(db, department_id=2), "ix_documents_department_uploaded_at_id"),
+    (lambda db: user_crud.list_users(db, principal=DEPT), "ix_users_department_id"),
+])
+def test_crud_query_uses_index(db, query_plans, call, index):
+    assert index in _single_plan(query_plans(lambda: call(db)))
+
+
+@pytest.mark.parametrize("call", [
+    lambda db: checklist_crud.list_template_titles(db, 2),
+    lambda db: checklist_crud.list_all_checklist_items(db, principal=DEPT),
+    lambda db: checklist_crud.list_all_checklist_items(db, principal=EMPLOYEE),
+    lambda db: document_crud.list_documents(db, principal=EMPLOYEE),
+    lambda db: list_plan_view(db, 1),
+])
+def test_scoped_queries_have_no_full_scan(db, query_plans, call):
+    plan = _single_plan(query_plans(lambda: call(db)))
+    assert "USING" in plan
+
+
+@pytest.mark.parametrize("call, index", [
+    (lambda db: user_crud.get_user_by_login(db, "alice"), "ix_users_email"),
+    (lambda db: user_crud.get_user_by_login(db, "alice"), "ix_users_username"),
+    (lambda db: user_crud.count_users(db, principal=DEPT), "ix_users_department_id"),
+    (lambda db: document_crud.count_documents(db, department_id=2), "ix_documents_department_uploaded_at_id"),
+    (lambda db: document_crud.count_documents(db, principal=EMPLOYEE), "ix_documents_department_uploaded_at_id"),
+    (lambda db: checklist_crud.count_checklist_items(db, principal=EMPLOYEE), "ix_checklist_items_user_id"),
+    (lambda db: checklist_crud.count_checklist_items(db, principal=DEPT), "ix_checklist_items_template_department"),
+    (lambda db: progress_crud.list_department_progress(db, 2), "department_checklist_progress"),
+    (lambda db: template_propagation.get_job(db, "job"), "propagation_jobs"),
+    (lambda db: onboarding_plan_crud.get_latest_plan(db, 2), "onboarding_plans"),
+    (lambda db: onboarding_plan_crud.is_step_in_current_plan(db, 1, 1), "onboarding_plan_steps"),
+    (lambda db: db.execute(exports.users_export(DEPT)).all(), "ix_users_department_id"),
+    (lambda db: db.execute(exports.checklist_items_export(EMPLOYEE)).all(), "ix_checklist_items_user_id"),
+    (lambda db: db.execute(exports.checklist_items_export(DEPT)).all(), "ix_checklist_items_template_department"),
+    (lambda db: db.execute(exports.documents_export(EMPLOYEE)).all(), "ix_documents_department_uploaded_at_id"),
+])
+def test_lookup_count_and_export_queries_use_index(db, query_plans, call, index):
+    assert index in _single_plan(query_plans(lambda: call(db)))
+
+
+@pytest.fixture
+def onboarded(db, make_department, make_user):
+    """Département 2 avec un employé, un item ouvert et un plan publié (ids alignés sur DEPT)."""
+    make_department("Sales")
+    dept = make_department("Support")
+    user = make_user("alice", department_id=dept.id)
+    item = ChecklistItem(title="Badge", user_id=user.id, department_id=dept.id)
+    db.add_all([item, ChecklistItem(title="Laptop", department_id=dept.id)])
+    db.commit()
+    progress_crud.refresh_user_progress(db, [user.id])
+    onboarding_plan_crud.publish_plan(db, dept.id)
+    db.commit()
+    return user.id, item.id
+
+
+@pytest.mark.parametrize("call", [
+    lambda db, user_id, item_id: checklist_crud.complete_checklist_item_if_allowed(db, item_id, DEPT),
+    lambda db, user_id, item_id: checklist_crud.complete_checklist_item_if_allowed(db, item_id, MANAGER),
+    lambda db, user_id, item_id: checklist_crud.complete_checklist_item_if_allowed(db, item_id, EMPLOYEE),
+    lambda db, user_id, item_id: checklist_crud.delete_checklist_item_if_allowed(db, item_id, DEPT),
+    lambda db, user_id, item_id: checklist_crud.delete_checklist_item_if_allowed(db, item_id, MANAGER),
+    lambda db, user_id, item_id: progress_crud.shift_item_progress(db, user_id, item_id + 10, total=1,
+                                                                    open_after=True),
+    lambda db, user_id, item_id: progress_crud.refresh_user_progress(db, [user_id]),
+    lambda db, user_id, item_id: template_propagation.create_job(db, "create", "Badge", 2),
+    lambda db, user_id, item_id: template_propagation._user_ids(db, 2),
+    lambda db, user_id, item_id: onboarding_plan_crud.pin_users_to_plan(
+        db, onboarding_plan_crud.get_latest_plan(db, 2)),
+    lambda db, user_id, item_id: onboarding_plan_crud.complete_plan_step(db, user_id, 1),
+])
+def test_write_paths_have_no_full_scan(db, query_plans, onboarded, call):
+    user_id, item_id = onboarded
+    plans = query_plans(lambda: call(db, user_id, item_id))
+    assert plans
+    assert [_full_scans(plan) for plan in plans] == [[] for _ in plans]
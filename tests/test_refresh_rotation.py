@@ -0,0 +1,50 @@
+import threading
+
+from app.api.auth import issue_tokens
+from app.models.revoked_token import RevokedToken
+
+
+def _refresh(client, refresh_token):
+    return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def _assert_family_revoked(client, db, user, issued):
+    db.refresh(user)
+    assert user.token_version == 1
+    for tokens in issued:
+        assert _refresh(client, tokens["refresh_token"]).status_code == 401
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.get("/api/checklists/me", headers=headers).status_code == 401
+
+
+def test_replayed_refresh_token_revokes_the_family(client, db, make_user):
+    user = make_user("alice")
+    stolen = issue_tokens(user)["refresh_token"]
+
+    rotated = _refresh(client, stolen)
+    assert rotated.status_code == 200
+    assert _refresh(client, stolen).status_code == 401
+
+    _assert_family_revoked(client, db, user, [rotated.json()])
+
+
+def test_concurrent_replay_is_detected(client, db, make_user):
+    user = make_user("alice")
+    stolen = issue_tokens(user)["refresh_token"]
+    barrier = threading.Barrier(2)
+    responses = []
+
+    def replay():
+        barrier.wait()
+        responses.append(_refresh(client, stolen))
+
+    threads = [threading.Thread(target=replay) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # une seule rotation réussit, l'autre est vue comme une réutilisation (pas de 500)
+    assert sorted(r.status_code for r in responses) == [200, 401]
+    assert db.query(RevokedToken).count() == 1
+    _assert_family_revoked(client, db, user, [r.json() for r in responses if r.status_code == 200])
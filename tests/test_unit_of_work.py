@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import event
+
+from app.db.session import engine
+from app.models.checklist import ChecklistItem
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def commits():
+    """Nombre de COMMIT émis sur le moteur pendant le test."""
+    counter = {"n": 0}
+
+    def on_commit(conn):
+        counter["n"] += 1
+
+    event.listen(engine, "commit", on_commit)
+    yield counter
+    event.remove(engine, "commit", on_commit)
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin", role="SUPERADMIN")
+
+
+def test_create_item_commits_once(client, db, admin, make_user, commits):
+    user = make_user("emp")
+    headers = auth_headers(admin)
+    commits["n"] = 0
+    response = client.post("/api/checklists/", json={"title": "Badge", "user_id": user.id}, headers=headers)
+    assert response.status_code == 201
+    assert commits["n"] == 1
+
+
+def test_update_user_and_reassign_onboarding_commits_once(client, db, admin, make_user, make_department, commits):
+    dept = make_department("IT")
+    db.add(ChecklistItem(title="Laptop", department_id=dept.id, user_id=None))
+    db.commit()
+    user = make_user("emp")
+    headers = auth_headers(admin)
+    commits["n"] = 0
+    response = client.put(f"/api/users/{user.id}", json={"department_id": dept.id}, headers=headers)
+    assert response.status_code == 200
+    assert commits["n"] == 1
+
+
+def test_upload_document_commits_once(client, admin, commits):
+    headers = auth_headers(admin)
+    commits["n"] = 0
+    response = client.post("/api/documents/", params={"title": "Guide"},
+                           files={"file": ("guide.txt", b"hello", "text/plain")}, headers=headers)
+    assert response.status_code == 201
+    assert commits["n"] == 1
+
+
+def test_delete_item_commits_once(client, db, admin, make_user, commits):
+    user = make_user("emp")
+    item = ChecklistItem(title="Badge", user_id=user.id)
+    db.add(item)
+    db.commit()
+    headers = auth_headers(admin)
+    commits["n"] = 0
+    response = client.delete(f"/api/checklists/{item.id}", headers=headers)
+    assert response.status_code == 204
+    assert commits["n"] == 1
+
+
+def test_read_endpoint_commits_at_most_once(client, make_user, commits):
+    headers = auth_headers(make_user("emp"))
+    commits["n"] = 0
+    assert client.get("/api/checklists/me", headers=headers).status_code == 200
+    assert commits["n"] <= 1